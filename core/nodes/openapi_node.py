@@ -7,6 +7,9 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Matches `{name}` placeholders in an OpenAPI path template
+_PATH_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
 # Import SSRF validation from http_node
 try:
     from core.nodes.http_node import validate_url, ALLOWED_SCHEMES
@@ -156,6 +159,7 @@ class OpenAPINodeExecutor:
 
             query_params = {}
             headers = {}
+            path_values = {}
             body = None
 
             # 4. Map User Params to Request Locations with sanitization
@@ -168,9 +172,7 @@ class OpenAPINodeExecutor:
                     val = self.params[p_name]
 
                     if p_in == "path":
-                        # Sanitize path parameter to prevent traversal/injection
-                        safe_val = sanitize_path_param(val)
-                        path = path.replace(f"{{{p_name}}}", safe_val)
+                        path_values[p_name] = val
                     elif p_in == "query":
                         query_params[p_name] = sanitize_query_param(val)
                     elif p_in == "header":
@@ -180,6 +182,17 @@ class OpenAPINodeExecutor:
                         # Body handling - validate JSON if applicable
                         body = val
 
+            if path_values:
+                # Substitute all path placeholders in a single pass, sanitizing
+                # each value to prevent traversal/injection
+                def _fill(match: re.Match) -> str:
+                    name = match.group(1)
+                    if name in path_values:
+                        return sanitize_path_param(path_values[name])
+                    return match.group(0)
+
+                path = _PATH_PLACEHOLDER.sub(_fill, path)
+
             # Construct Full URL
             if server.endswith('/') and path.startswith('/'):
                 full_url = server + path[1:]
@@ -209,25 +222,29 @@ class OpenAPINodeExecutor:
                         json=body if body else None,
                         timeout=aiohttp.ClientTimeout(total=self.timeout)
                     ) as response:
-                        # Check response size
+                        # Check response size; Content-Length only pre-rejects,
+                        # since aiohttp decompresses and the decoded body can be
+                        # far larger than the header says
                         content_length = response.headers.get('Content-Length')
-                        if content_length and int(content_length) > self.max_response_size:
+                        if content_length and content_length.isdigit() and int(content_length) > self.max_response_size:
                             return {
                                 "ok": False,
                                 "status": 413,
                                 "error": "Response too large"
                             }
 
-                        # Read with size limit
-                        resp_bytes = await response.content.read(self.max_response_size + 1)
-                        if len(resp_bytes) > self.max_response_size:
-                            return {
-                                "ok": False,
-                                "status": 413,
-                                "error": "Response exceeded size limit"
-                            }
-
-                        text = resp_bytes.decode('utf-8', errors='replace')
+                        # Stream the decoded body with a hard cap
+                        buf = bytearray()
+                        async for chunk in response.content.iter_chunked(65536):
+                            buf += chunk
+                            if len(buf) > self.max_response_size:
+                                return {
+                                    "ok": False,
+                                    "status": 413,
+                                    "error": "Response exceeded size limit"
+                                }
+
+                        text = buf.decode('utf-8', errors='replace')
 
                         try:
                             data = json.loads(text)
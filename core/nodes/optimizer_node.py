@@ -1,9 +1,24 @@
+import heapq
 import json
 import logging
 from typing import Dict, Any, Optional, Callable
 
 logger = logging.getLogger(__name__)
 
+# The state summary is embedded in an LLM prompt, so compact output is preferred
+# (fewer tokens, faster serialization).
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+# Cap on nodes included in the state summary so the prompt size stays bounded
+MAX_REPORTED_NODES = 20
+
 class OptimizerNode:
     """
     Workflow Optimizer Node.
@@ -24,16 +39,23 @@ class OptimizerNode:
 
         await engine.log(node.name, "⚙️ Analyzing workflow state and performance...")
         
-        # Create a summary of the current workflow state
+        # Create a summary of the current workflow state, limited to the most
+        # interesting nodes (failures first, then the longest outputs)
+        others = [n for n in engine.current_workflow.nodes.values() if n.id != node.id]
+        reported = heapq.nlargest(
+            MAX_REPORTED_NODES, others,
+            key=lambda n: (n.status == "failed", len(n.output) if n.output else 0)
+        )
         wf_state = {
+            "total_nodes": len(others),
             "nodes": {
-                nid: {
+                n.id: {
                     "name": n.name,
                     "status": n.status,
                     "error": n.error,
                     "output_len": len(n.output) if n.output else 0,
                     "tier": n.tier
-                } for nid, n in engine.current_workflow.nodes.items() if n.id != node.id
+                } for n in reported
             }
         }
         
@@ -43,7 +65,7 @@ MISSION: {input_text}
 CONTEXT: {context_str}
 
 CURRENT WORKFLOW STATE:
-{json.dumps(wf_state, indent=2)}
+{_dumps(wf_state)}
 
 TASK:
 1. Diagnose any failures or bottlenecks.
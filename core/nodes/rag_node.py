@@ -2,6 +2,7 @@ import os
 import json
 import logging
 import asyncio
+import aiofiles
 from typing import Dict, Any, List
 from datetime import datetime
 
@@ -93,45 +94,65 @@ class RAGNodeExecutor:
     async def _index_knowledge_base(self):
         """Walk source path and chunk all .txt and .md files."""
         os.makedirs(self.source_path, exist_ok=True)
-        chunks = []
-        
-        for root, _, files in os.walk(self.source_path):
-            for file in files:
-                if file.endswith(('.txt', '.md')):
-                    path = os.path.join(root, file)
-                    try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            text = f.read()
-                            # Recursive Character Splitting (Simple version)
-                            file_chunks = self._split_text(text)
-                            for i, content in enumerate(file_chunks):
-                                chunks.append({
-                                    "id": f"{file}_{i}",
-                                    "source": file,
-                                    "content": content
-                                })
-                    except Exception as e:
-                        logger.error(f"Error reading {file}: {e}")
+        paths = [
+            os.path.join(root, file)
+            for root, _, files in os.walk(self.source_path)
+            for file in files
+            if file.endswith(('.txt', '.md'))
+        ]
+
+        # Read files concurrently (bounded) and chunk off the event loop
+        sem = asyncio.Semaphore(32)
+
+        async def _load_and_split(path: str) -> List[Dict[str, Any]]:
+            file = os.path.basename(path)
+            try:
+                async with sem:
+                    async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+                        text = await f.read()
+                # Recursive Character Splitting (Simple version)
+                file_chunks = await asyncio.to_thread(self._split_text, text)
+            except Exception as e:
+                logger.error(f"Error reading {file}: {e}")
+                return []
+            return [
+                {"id": f"{file}_{i}", "source": file, "content": content}
+                for i, content in enumerate(file_chunks)
+            ]
+
+        results = await asyncio.gather(*[_load_and_split(p) for p in paths])
+        chunks = [chunk for file_chunks in results for chunk in file_chunks]
 
         with open(self.index_file, 'w', encoding='utf-8') as f:
             json.dump({"chunks": chunks, "updated_at": datetime.now().isoformat()}, f, indent=2)
 
     def _split_text(self, text: str) -> List[str]:
-        """Simple recursive-style splitter."""
-        # Split by double newline (paragraphs) first
-        parts = text.split("\n\n")
+        """Simple recursive-style splitter.
+
+        Scans paragraph ("\n\n") boundaries by offset and slices each chunk
+        out of ``text`` once, instead of building it up by concatenation.
+        """
         chunks = []
-        current_chunk = ""
-        
-        for part in parts:
-            if len(current_chunk) + len(part) < self.chunk_size:
-                current_chunk += part + "\n\n"
+        n = len(text)
+        start = 0    # offset where the current chunk begins
+        cur_len = 0  # accumulated length, counting a separator after each part
+        pos = 0
+
+        while True:
+            end = text.find("\n\n", pos)
+            if end == -1:
+                end = n
+            part_len = end - pos
+            if cur_len + part_len < self.chunk_size:
+                cur_len += part_len + 2
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = part + "\n\n"
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-            
+                if cur_len:
+                    chunks.append(text[start:pos - 2].strip())
+                start = pos
+                cur_len = part_len + 2
+            if end == n:
+                break
+            pos = end + 2
+
+        chunks.append(text[start:].strip())
         return chunks
@@ -1,9 +1,21 @@
 import logging
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 
 logger = logging.getLogger(__name__)
 
+def _take_queries(text: str, k: int = 3) -> Iterator[str]:
+    """Yield at most `k` non-empty, stripped lines from an LLM response."""
+    if k <= 0:
+        return
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            yield line
+            k -= 1
+            if not k:
+                return
+
 class RagNode:
     """
     RAG (Retrieval Augmented Generation) Node.
@@ -37,7 +49,7 @@ class RagNode:
                         user_message=expansion_prompt,
                         model_override=node.model
                     )
-                    expanded = [q.strip() for q in expansion_resp.split("\n") if q.strip()][:3]
+                    expanded = list(_take_queries(expansion_resp))
                     if expanded:
                         queries.extend(expanded)
                         await engine.log(node.name, f"🔍 Expanded to {len(queries)} sub-queries.")
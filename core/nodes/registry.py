@@ -1,5 +1,7 @@
+import importlib
 import logging
-from typing import Dict, Any, Type, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Mapping, Type, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -7,65 +9,80 @@ class NodeRegistry:
     """
     Central registry for node executors.
     Supports dynamic registration of new node types.
+    Entries may be an executor class or a zero-argument loader returning one;
+    loaders are resolved (and memoized) on first lookup.
     """
-    _registry: Dict[str, Type] = {}
+    _types: Dict[str, Union[Type, Callable[[], Type]]] = {}
+    # Read-only view of the registry; mutate only through register()/register_many()
+    _registry: Mapping[str, Union[Type, Callable[[], Type]]] = MappingProxyType(_types)
 
     @classmethod
-    def register(cls, node_type: str, executor_class: Type):
-        """Register a new node type with its executor class."""
-        cls._registry[node_type] = executor_class
-        logger.info(f"Registered node type: {node_type} -> {executor_class.__name__}")
+    def register(cls, node_type: str, executor_class: Union[Type, Callable[[], Type]]):
+        """Register a new node type with its executor class (or a lazy loader)."""
+        cls._types[node_type] = executor_class
+        logger.info("Registered node type: %s -> %s", node_type, getattr(executor_class, "__name__", executor_class))
+
+    @classmethod
+    def register_many(cls, executors: Dict[str, Union[Type, Callable[[], Type]]]):
+        """Register several node types at once with a single summary log."""
+        cls._types.update(executors)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Registered %d node types", len(executors))
 
     @classmethod
     def get_executor(cls, node_type: str) -> Optional[Type]:
         """Get the executor class for a node type."""
-        return cls._registry.get(node_type)
+        executor = cls._registry.get(node_type)
+        if executor is not None and not isinstance(executor, type):
+            # Lazy entry: import the module now and memoize the class
+            executor = executor()
+            cls._types[node_type] = executor
+        return executor
 
     @classmethod
     def list_types(cls) -> list:
         """List all registered node types."""
         return list(cls._registry.keys())
 
+def _lazy(module_path: str, class_name: str) -> Callable[[], Type]:
+    """Build a loader that imports `module_path` and returns `class_name` on demand."""
+    def load() -> Type:
+        return getattr(importlib.import_module(module_path), class_name)
+    load.__name__ = class_name
+    return load
+
 def initialize_default_registry():
-    """Register all built-in node types."""
-    from core.nodes.system_nodes import BrowserNode, ShellNode, SystemNode
-    from core.nodes.memory_node import MemoryNode
-    from core.nodes.http_node import HttpNode
-    from core.nodes.agent_node import AgentNode
-    from core.nodes.script_node import ScriptNode
-    from core.nodes.github_node import GithubNode
-    from core.nodes.huggingface_node import HuggingfaceNode
-    from core.nodes.discovery_node import DiscoveryNode
-    from core.nodes.rag_node_modular import RagNode
-    from core.nodes.ui_nodes import A2UINode
-    from core.nodes.mcp_node import MCPNode
-    from core.nodes.notion_node import NotionNode
-    from core.nodes.google_node import GoogleNode
-    from core.nodes.comfy_node import ComfyNode
-    from core.nodes.trigger_nodes import TelegramTrigger, DiscordTrigger
-    from core.nodes.openapi_node import OpenAPINodeExecutor
-    from core.nodes.optimizer_node import OptimizerNode
-    
-    NodeRegistry.register("browser", BrowserNode)
-    NodeRegistry.register("shell", ShellNode)
-    NodeRegistry.register("system", SystemNode)
-    NodeRegistry.register("memory", MemoryNode)
-    NodeRegistry.register("http", HttpNode)
-    NodeRegistry.register("script", ScriptNode)
-    NodeRegistry.register("github", GithubNode)
-    NodeRegistry.register("huggingface", HuggingfaceNode)
-    NodeRegistry.register("discovery", DiscoveryNode)
-    NodeRegistry.register("rag", RagNode)
-    NodeRegistry.register("a2ui", A2UINode)
-    NodeRegistry.register("mcp", MCPNode)
-    NodeRegistry.register("notion", NotionNode)
-    NodeRegistry.register("google", GoogleNode)
-    NodeRegistry.register("comfy", ComfyNode)
-    NodeRegistry.register("telegram_trigger", TelegramTrigger)
-    NodeRegistry.register("discord_trigger", DiscordTrigger)
-    NodeRegistry.register("openapi", OpenAPINodeExecutor)
-    NodeRegistry.register("optimizer", OptimizerNode)
-    
-    # Standard LLM nodes use AgentNode
+    """Register all built-in node types.
+
+    Executor modules are imported lazily on first use, so startup does not pay
+    for node types a workflow never touches.
+    """
+    agent_node = _lazy("core.nodes.agent_node", "AgentNode")
+
+    defaults = {
+        "browser": _lazy("core.nodes.system_nodes", "BrowserNode"),
+        "shell": _lazy("core.nodes.system_nodes", "ShellNode"),
+        "system": _lazy("core.nodes.system_nodes", "SystemNode"),
+        "memory": _lazy("core.nodes.memory_node", "MemoryNode"),
+        "http": _lazy("core.nodes.http_node", "HttpNode"),
+        "script": _lazy("core.nodes.script_node", "ScriptNode"),
+        "github": _lazy("core.nodes.github_node", "GithubNode"),
+        "huggingface": _lazy("core.nodes.huggingface_node", "HuggingfaceNode"),
+        "discovery": _lazy("core.nodes.discovery_node", "DiscoveryNode"),
+        "rag": _lazy("core.nodes.rag_node_modular", "RagNode"),
+        "a2ui": _lazy("core.nodes.ui_nodes", "A2UINode"),
+        "mcp": _lazy("core.nodes.mcp_node", "MCPNode"),
+        "notion": _lazy("core.nodes.notion_node", "NotionNode"),
+        "google": _lazy("core.nodes.google_node", "GoogleNode"),
+        "comfy": _lazy("core.nodes.comfy_node", "ComfyNode"),
+        "telegram_trigger": _lazy("core.nodes.trigger_nodes", "TelegramTrigger"),
+        "discord_trigger": _lazy("core.nodes.trigger_nodes", "DiscordTrigger"),
+        "openapi": _lazy("core.nodes.openapi_node", "OpenAPINodeExecutor"),
+        "optimizer": _lazy("core.nodes.optimizer_node", "OptimizerNode"),
+    }
+
+    # Standard LLM nodes use AgentNode (without clobbering dedicated executors like "optimizer")
     for t in ["agent", "auditor", "router", "character", "director", "optimizer", "architect", "critic"]:
-        NodeRegistry.register(t, AgentNode)
+        defaults.setdefault(t, agent_node)
+
+    NodeRegistry.register_many(defaults)
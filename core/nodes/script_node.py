@@ -1,12 +1,18 @@
 import os
 import ast
+import types
 import logging
+import functools
 from typing import Dict, Any, Optional, Set
 
+from core.tools.cli import CLITool
+from core.tools.git_tool import GitTool
+from core.tools.hf_tool import HFTool
+
 logger = logging.getLogger(__name__)
 
 # Dangerous built-ins and modules that should be blocked
-BLOCKED_NAMES = {
+BLOCKED_NAMES = frozenset({
     # Dangerous built-ins
     'eval', 'exec', 'compile', '__import__', 'open', 'input',
     'breakpoint', 'memoryview', 'vars', 'locals', 'globals',
@@ -15,10 +21,22 @@ BLOCKED_NAMES = {
     'socket', 'urllib', 'requests', 'http', 'ftplib',
     'pickle', 'shelve', 'marshal', 'code', 'codeop',
     'ctypes', 'multiprocessing', 'threading',
-}
+})
+
+# Attribute calls that spawn processes or replace the interpreter (e.g. os.system)
+_DANGEROUS_CALL_ATTRS = frozenset({
+    'system', 'popen', 'spawn', 'fork', 'exec', 'execl', 'execle', 'execlp',
+    'execv', 'execve', 'execvp',
+})
+
+# Dunder attributes that scripts may still access
+_ALLOWED_DUNDERS = frozenset({
+    '__init__', '__str__', '__repr__', '__len__', '__iter__', '__next__',
+    '__getitem__', '__setitem__', '__contains__',
+})
 
 # Allowed safe built-ins
-SAFE_BUILTINS = {
+SAFE_BUILTINS = frozenset({
     'abs', 'all', 'any', 'ascii', 'bin', 'bool', 'bytearray', 'bytes',
     'callable', 'chr', 'classmethod', 'complex', 'dict', 'dir', 'divmod',
     'enumerate', 'filter', 'float', 'format', 'frozenset', 'getattr',
@@ -27,7 +45,7 @@ SAFE_BUILTINS = {
     'ord', 'pow', 'property', 'range', 'repr', 'reversed', 'round', 'set',
     'setattr', 'slice', 'sorted', 'staticmethod', 'str', 'sum', 'super',
     'tuple', 'type', 'zip', 'True', 'False', 'None',
-}
+})
 
 
 class ScriptSecurityError(Exception):
@@ -35,61 +53,65 @@ class ScriptSecurityError(Exception):
     pass
 
 
-class SafetyVisitor(ast.NodeVisitor):
-    """AST visitor that checks for dangerous constructs."""
-
-    def __init__(self):
-        self.errors: list = []
-
-    def visit_Import(self, node):
-        """Block import statements."""
-        for alias in node.names:
-            if alias.name.split('.')[0] in BLOCKED_NAMES:
-                self.errors.append(f"Import of '{alias.name}' is not allowed")
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node):
-        """Block from...import statements for dangerous modules."""
-        if node.module and node.module.split('.')[0] in BLOCKED_NAMES:
-            self.errors.append(f"Import from '{node.module}' is not allowed")
-        self.generic_visit(node)
-
-    def visit_Call(self, node):
-        """Check function calls for dangerous patterns."""
-        # Check for direct calls to dangerous functions
-        if isinstance(node.func, ast.Name):
-            if node.func.id in BLOCKED_NAMES:
-                self.errors.append(f"Call to '{node.func.id}' is not allowed")
-        # Check for attribute access like os.system
-        elif isinstance(node.func, ast.Attribute):
-            if node.func.attr in {'system', 'popen', 'spawn', 'fork', 'exec', 'execl', 'execle', 'execlp', 'execv', 'execve', 'execvp'}:
-                self.errors.append(f"Call to '{node.func.attr}' is not allowed")
-        self.generic_visit(node)
-
-    def visit_Attribute(self, node):
-        """Check for dangerous attribute access."""
-        # Block dunder attribute access that could be used for escapes
-        if node.attr.startswith('__') and node.attr.endswith('__'):
-            if node.attr not in {'__init__', '__str__', '__repr__', '__len__', '__iter__', '__next__', '__getitem__', '__setitem__', '__contains__'}:
-                self.errors.append(f"Access to '{node.attr}' is not allowed")
-        self.generic_visit(node)
+def _check_tree(tree: ast.AST) -> None:
+    """
+    Walk the AST once and raise ScriptSecurityError on the first dangerous
+    construct found.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            # Block import statements
+            for alias in node.names:
+                if alias.name.partition('.')[0] in BLOCKED_NAMES:
+                    raise ScriptSecurityError(f"Import of '{alias.name}' is not allowed")
+        elif isinstance(node, ast.ImportFrom):
+            # Block from...import statements for dangerous modules
+            if node.module and node.module.partition('.')[0] in BLOCKED_NAMES:
+                raise ScriptSecurityError(f"Import from '{node.module}' is not allowed")
+        elif isinstance(node, ast.Call):
+            func = node.func
+            # Check for direct calls to dangerous functions
+            if isinstance(func, ast.Name):
+                if func.id in BLOCKED_NAMES:
+                    raise ScriptSecurityError(f"Call to '{func.id}' is not allowed")
+            # Check for attribute access like os.system
+            elif isinstance(func, ast.Attribute):
+                if func.attr in _DANGEROUS_CALL_ATTRS:
+                    raise ScriptSecurityError(f"Call to '{func.attr}' is not allowed")
+        elif isinstance(node, ast.Attribute):
+            # Block dunder attribute access that could be used for escapes
+            attr = node.attr
+            if attr[:2] == '__' == attr[-2:] and attr not in _ALLOWED_DUNDERS:
+                raise ScriptSecurityError(f"Access to '{attr}' is not allowed")
 
 
 def validate_script(code: str) -> None:
     """
     Validate script code for security issues using AST analysis.
-    Raises ScriptSecurityError if dangerous constructs are found.
+    Raises ScriptSecurityError on the first dangerous construct found.
     """
     try:
         tree = ast.parse(code)
     except SyntaxError as e:
         raise ScriptSecurityError(f"Syntax error in script: {e}")
 
-    visitor = SafetyVisitor()
-    visitor.visit(tree)
+    try:
+        _check_tree(tree)
+    except ScriptSecurityError as e:
+        # Report only the first violation; the rest of the tree is never walked
+        raise ScriptSecurityError(f"Security violation: {e}") from None
 
-    if visitor.errors:
-        raise ScriptSecurityError(f"Security violations: {'; '.join(visitor.errors)}")
+
+@functools.lru_cache(maxsize=256)
+def _compile_script(code: str, secure: bool) -> types.CodeType:
+    """
+    Validate (when `secure`) and compile script code.
+    Results are cached per source, so repeated runs of the same script skip
+    parsing, the safety walk and bytecode compilation. Failures are not cached.
+    """
+    if secure:
+        validate_script(code)
+    return compile(code, "<script>", "exec")
 
 
 def create_restricted_builtins() -> Dict[str, Any]:
@@ -102,6 +124,69 @@ def create_restricted_builtins() -> Dict[str, Any]:
     return restricted
 
 
+# Built once at import; execute() hands each script its own copy
+_RESTRICTED_BUILTINS = create_restricted_builtins()
+
+
+def _shell(command: str) -> str:
+    """Executes a shell command and returns output."""
+    res = CLITool.execute(command, ".", use_shell=False)
+    if res.get("success"):
+        return res.get("stdout", "")
+    else:
+        return f"Error (Exit {res.get('returncode')}): {res.get('stderr')}"
+
+
+@functools.lru_cache(maxsize=512)
+def _is_allowed_path(abs_path: str, allowed_abs: tuple) -> bool:
+    """Check whether an absolute path lies within one of the allowed directories."""
+    # Component-wise, so '/foo/barbaz' does not match an allowed '/foo/bar'
+    for allowed in allowed_abs:
+        try:
+            if os.path.commonpath([abs_path, allowed]) == allowed:
+                return True
+        except ValueError:
+            # Different drives (Windows) - cannot be contained
+            continue
+    return False
+
+
+class FileHelper:
+    """Restricted file helper with path validation."""
+
+    def __init__(self, allowed_abs: tuple):
+        self._allowed_abs = allowed_abs
+
+    def _validate_path(self, path: str) -> str:
+        """Validate and normalize path, preventing traversal attacks."""
+        # Resolve to absolute path (depends on cwd, so kept out of the cache)
+        abs_path = os.path.abspath(path)
+        if _is_allowed_path(abs_path, self._allowed_abs):
+            return abs_path
+        raise PermissionError(f"Access denied: {path} is outside allowed directories")
+
+    def read(self, path: str) -> str:
+        validated = self._validate_path(path)
+        with open(validated, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write(self, path: str, content: str) -> None:
+        validated = self._validate_path(path)
+        with open(validated, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def list(self, path: str = '.') -> list:
+        validated = self._validate_path(path)
+        return os.listdir(validated)
+
+    def exists(self, path: str) -> bool:
+        try:
+            validated = self._validate_path(path)
+            return os.path.exists(validated)
+        except PermissionError:
+            return False
+
+
 class ScriptNode:
     """
     Executes Python logic scripts in a sandboxed environment.
@@ -118,6 +203,9 @@ class ScriptNode:
         self.config = config
         self.enable_security = config.get("enable_security", True)
         self.allowed_paths: Set[str] = set(config.get("allowed_paths", ['.']))
+        # Resolve allowed directories once rather than on every file access
+        self._allowed_abs = tuple(os.path.abspath(p) for p in self.allowed_paths)
+        self._file_helper = FileHelper(self._allowed_abs)
 
     async def execute(self, inputs: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         engine = context.get('engine')
@@ -130,68 +218,20 @@ class ScriptNode:
 
         await engine.log(node.name, "Executing Python logic script...")
 
-        # Validate script security
-        script_code = node.script_code
-        if self.enable_security:
-            try:
-                validate_script(script_code)
-            except ScriptSecurityError as e:
-                logger.warning(f"Script security violation: {e}")
-                return {"ok": False, "error": f"Script blocked: {e}"}
+        # Validate script security and compile (cached per script source)
+        try:
+            code_obj = _compile_script(node.script_code, self.enable_security)
+        except ScriptSecurityError as e:
+            logger.warning(f"Script security violation: {e}")
+            return {"ok": False, "error": f"Script blocked: {e}"}
+        except SyntaxError as e:
+            return {"ok": False, "error": f"Script error: SyntaxError: {e}"}
 
         try:
             # Prepare restricted execution context
-            from core.tools.cli import CLITool
-            from core.tools.git_tool import GitTool
-            from core.tools.hf_tool import HFTool
-
-            allowed_paths = self.allowed_paths
-
-            def shell(command):
-                """Executes a shell command and returns output."""
-                res = CLITool.execute(command, ".", use_shell=False)
-                if res.get("success"):
-                    return res.get("stdout", "")
-                else:
-                    return f"Error (Exit {res.get('returncode')}): {res.get('stderr')}"
-
-            class FileHelper:
-                """Restricted file helper with path validation."""
-
-                def _validate_path(self, path: str) -> str:
-                    """Validate and normalize path, preventing traversal attacks."""
-                    # Resolve to absolute path
-                    abs_path = os.path.abspath(path)
-                    # Check if path is within allowed directories
-                    for allowed in allowed_paths:
-                        allowed_abs = os.path.abspath(allowed)
-                        if abs_path.startswith(allowed_abs):
-                            return abs_path
-                    raise PermissionError(f"Access denied: {path} is outside allowed directories")
-
-                def read(self, path: str) -> str:
-                    validated = self._validate_path(path)
-                    with open(validated, 'r', encoding='utf-8') as f:
-                        return f.read()
-
-                def write(self, path: str, content: str) -> None:
-                    validated = self._validate_path(path)
-                    with open(validated, 'w', encoding='utf-8') as f:
-                        f.write(content)
-
-                def list(self, path: str = '.') -> list:
-                    validated = self._validate_path(path)
-                    return os.listdir(validated)
-
-                def exists(self, path: str) -> bool:
-                    try:
-                        validated = self._validate_path(path)
-                        return os.path.exists(validated)
-                    except PermissionError:
-                        return False
-
-            # Build restricted globals
-            restricted_globals = {"__builtins__": create_restricted_builtins()}
+            # Build restricted globals (copy the prebuilt builtins so a script
+            # cannot alter them for later runs)
+            restricted_globals = {"__builtins__": dict(_RESTRICTED_BUILTINS)}
 
             script_context = {
                 "input": input_text,
@@ -199,8 +239,8 @@ class ScriptNode:
                 "blackboard": engine.blackboard,
                 "output": "",  # Script should populate this
                 "node": node,
-                "shell": shell,
-                "files": FileHelper(),
+                "shell": _shell,
+                "files": self._file_helper,
                 "cli": CLITool,
                 "git": GitTool,
                 "hf": HFTool,
@@ -208,7 +248,7 @@ class ScriptNode:
             }
 
             # Execute with restricted globals
-            exec(script_code, restricted_globals, script_context)
+            exec(code_obj, restricted_globals, script_context)
 
             output = str(script_context.get("output", "Script executed successfully."))
             return {"ok": True, "output": output}
@@ -4,18 +4,21 @@ import logging
 import base64
 import re
 import shlex
+import signal
+import functools
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
 # URL validation for browser navigation
-ALLOWED_BROWSER_SCHEMES = {'http', 'https', 'file'}
-BLOCKED_BROWSER_HOSTS = {'localhost', '127.0.0.1', '0.0.0.0', '::1'}
+ALLOWED_BROWSER_SCHEMES = frozenset({'http', 'https', 'file'})
+BLOCKED_BROWSER_HOSTS = frozenset({'localhost', '127.0.0.1', '0.0.0.0', '::1'})
 
 
+@functools.lru_cache(maxsize=1024)
 def validate_browser_url(url: str) -> tuple[bool, str]:
-    """Validate URL for browser navigation."""
+    """Validate URL for browser navigation (pure, so results are cached per URL)."""
     if not url:
         return False, "Empty URL"
 
@@ -35,6 +38,65 @@ def validate_browser_url(url: str) -> tuple[bool, str]:
     return True, ""
 
 
+class _BrowserPool:
+    """
+    Keeps one Playwright driver and one launched browser per launch
+    configuration alive across BrowserNode executions. Each execution gets
+    its own (cheap) BrowserContext instead of a freshly launched browser.
+    """
+    def __init__(self):
+        self._pw = None
+        self._browsers: Dict[tuple, Any] = {}
+        # Created on first use: the pool is built at import, and on Python 3.9
+        # an asyncio.Lock binds to the loop current at construction
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def acquire(self, browser_type: str, headless: bool, args: tuple):
+        """Return a connected browser for this configuration, launching it if needed."""
+        key = (browser_type, headless, args)
+        browser = self._browsers.get(key)
+        if browser is not None and browser.is_connected():
+            return browser
+
+        async with self._get_lock():
+            browser = self._browsers.get(key)
+            if browser is not None and browser.is_connected():
+                return browser
+            if self._pw is None:
+                from playwright.async_api import async_playwright
+                self._pw = await async_playwright().start()
+            browser_launcher = getattr(self._pw, browser_type)
+            browser = await browser_launcher.launch(headless=headless, args=list(args))
+            self._browsers[key] = browser
+            return browser
+
+    async def close(self):
+        """Close all pooled browsers and stop the Playwright driver."""
+        async with self._get_lock():
+            for browser in self._browsers.values():
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pooled browser: {e}")
+            self._browsers.clear()
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
+
+
+_BROWSER_POOL = _BrowserPool()
+
+
+async def close_browsers():
+    """Shut down pooled browsers (called on server shutdown)."""
+    await _BROWSER_POOL.close()
+
+
 class BrowserNode:
     """
     Executes browser-based tasks using Playwright.
@@ -54,6 +116,10 @@ class BrowserNode:
         # Security: Enable sandbox by default (disable only if explicitly needed)
         self.disable_sandbox = config.get("disable_sandbox", False)
         self.timeout = config.get("timeout", 30000)  # 30 second default
+        # Screenshots are returned as raw JPEG bytes; base64 only for text/JSON sinks
+        self.encode_screenshot = config.get("encode_screenshot", False)
+        # Full DOM serialization is only done for "extract" unless explicitly requested
+        self.return_content = config.get("return_content", False)
 
     async def execute(self, inputs: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         url = inputs.get("url")
@@ -71,72 +137,64 @@ class BrowserNode:
                 return {"ok": False, "error": f"Invalid URL: {error}"}
 
         try:
-            from playwright.async_api import async_playwright
+            import playwright.async_api  # noqa: F401
         except ImportError:
             return {"ok": False, "error": "Playwright not installed"}
 
-        async with async_playwright() as p:
-            try:
-                browser_launcher = getattr(p, self.browser_type)
-
-                # Build browser args
-                browser_args: List[str] = []
-                if self.disable_sandbox:
-                    # Only disable sandbox if explicitly configured
-                    logger.warning("Browser sandbox disabled - this reduces security")
-                    browser_args.extend(["--no-sandbox", "--disable-setuid-sandbox"])
-                browser_args.append("--disable-dev-shm-usage")
-
-                browser = await browser_launcher.launch(
-                    headless=self.headless,
-                    args=browser_args
-                )
-                page = await browser.new_page()
-                
-                try:
-                    if action == "navigate" or url:
-                        await page.goto(url, wait_until="networkidle", timeout=30000)
-                    
-                    if action == "click" and selector:
-                        await page.click(selector)
-                    elif action == "type" and selector and text:
-                        await page.type(selector, text)
-                    elif action == "extract":
-                        content = await page.content()
-                        # Return content
-                        await browser.close()
-                        return {"ok": True, "output": content, "data": {"content": content}}
-                    
-                    # Take a screenshot for "Live View"
-                    screenshot = await page.screenshot(type="jpeg", quality=50)
-                    b64_screenshot = base64.b64encode(screenshot).decode('utf-8')
-                    
-                    final_url = page.url
-                    final_title = await page.title()
-                    content = await page.content()
-                    
-                    await browser.close()
-                    return {
-                        "ok": True, 
-                        "output": f"Browser action '{action}' completed on {url}",
-                        "data": {
-                            "screenshot": b64_screenshot,
-                            "url": final_url,
-                            "title": final_title,
-                            "content": content
-                        }
-                    }
-                except Exception as e:
-                    import traceback
-                    err_msg = f"{str(e)}\n{traceback.format_exc()}"
-                    logger.error(f"Browser internal error: {err_msg}")
-                    await browser.close()
-                    return {"ok": False, "error": err_msg}
-            except Exception as e:
-                import traceback
-                err_msg = f"Failed to launch browser: {str(e)}\n{traceback.format_exc()}"
-                logger.error(err_msg)
-                return {"ok": False, "error": err_msg}
+        try:
+            # Build browser args
+            browser_args: List[str] = []
+            if self.disable_sandbox:
+                # Only disable sandbox if explicitly configured
+                logger.warning("Browser sandbox disabled - this reduces security")
+                browser_args.extend(["--no-sandbox", "--disable-setuid-sandbox"])
+            browser_args.append("--disable-dev-shm-usage")
+
+            browser = await _BROWSER_POOL.acquire(self.browser_type, self.headless, tuple(browser_args))
+            # Fresh isolated context per execution; the browser itself stays warm
+            browser_context = await browser.new_context()
+        except Exception as e:
+            logger.exception("Failed to launch browser")
+            return {"ok": False, "error": f"Failed to launch browser: {type(e).__name__}: {e}"}
+
+        try:
+            page = await browser_context.new_page()
+
+            if action == "navigate" or url:
+                await page.goto(url, wait_until="networkidle", timeout=30000)
+
+            if action == "click" and selector:
+                await page.click(selector)
+            elif action == "type" and selector and text:
+                await page.type(selector, text)
+            elif action == "extract":
+                content = await page.content()
+                # Return content
+                return {"ok": True, "output": content, "data": {"content": content}}
+
+            # Take a screenshot for "Live View"
+            screenshot = await page.screenshot(type="jpeg", quality=50, full_page=False)
+            if self.encode_screenshot:
+                screenshot = base64.b64encode(screenshot).decode('ascii')
+
+            data = {
+                "screenshot": screenshot,
+                "url": page.url,
+                "title": await page.title()
+            }
+            if self.return_content:
+                data["content"] = await page.content()
+
+            return {
+                "ok": True, 
+                "output": f"Browser action '{action}' completed on {url}",
+                "data": data
+            }
+        except Exception as e:
+            logger.exception("Browser internal error")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            await browser_context.close()
 
 class ShellNode:
     """
@@ -157,6 +215,8 @@ class ShellNode:
         r'>\s*/dev/sd[a-z]',  # Write to raw disk
         r'chmod\s+777\s+/',  # Dangerous permission changes at root
     ]
+    # All blocked patterns combined into one case-insensitive alternation
+    _BLOCKED_RE = re.compile('|'.join(f'(?:{p})' for p in BLOCKED_PATTERNS), re.IGNORECASE)
 
     def __init__(self, node_id: str, config: Dict[str, Any]):
         self.node_id = node_id
@@ -165,27 +225,65 @@ class ShellNode:
         self.timeout = config.get("timeout", 30)
         self.max_output = config.get("max_output", 1024 * 1024)  # 1MB default
         self.allowed_commands: Optional[List[str]] = config.get("allowed_commands")
+        # Hashable form of the whitelist, used as part of the validation cache key
+        self._allowed_key: Optional[tuple] = tuple(self.allowed_commands) if self.allowed_commands is not None else None
+        # Commands run directly (no /bin/sh) unless pipelines/redirection are explicitly needed
+        self.use_shell = config.get("use_shell", False)
 
     def _validate_command(self, command: str) -> tuple[bool, str]:
         """Validate command against security rules."""
         if not command or not isinstance(command, str):
             return False, "Empty command"
+        return self._check_command(command, self._allowed_key)
 
-        command_lower = command.lower()
-
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _check_command(command: str, allowed: Optional[tuple]) -> tuple[bool, str]:
+        """Pure validation of a command string against the blocked patterns and whitelist."""
         # Check blocked patterns
-        for pattern in self.BLOCKED_PATTERNS:
-            if re.search(pattern, command_lower):
-                return False, "Command matches blocked pattern"
+        if ShellNode._BLOCKED_RE.search(command):
+            return False, "Command matches blocked pattern"
 
         # Check whitelist if configured
-        if self.allowed_commands is not None:
+        if allowed is not None:
             first_word = command.split()[0] if command.strip() else ''
-            if first_word not in self.allowed_commands:
+            if first_word not in allowed:
                 return False, f"Command '{first_word}' not in allowed list"
 
         return True, ""
 
+    @staticmethod
+    def _kill(process):
+        """Kill the child and, on POSIX, everything in its process group."""
+        try:
+            if os.name != 'nt':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    async def _read_capped(self, process, stream, buf: bytearray) -> bool:
+        """
+        Read `stream` into `buf`, keeping at most max_output bytes.
+        Kills the process once the cap is exceeded and drains the pipe to EOF
+        without buffering; returns True if output was truncated.
+        """
+        truncated = False
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                return truncated
+            if truncated:
+                continue
+            room = self.max_output - len(buf)
+            if len(chunk) > room:
+                buf += chunk[:room]
+                truncated = True
+                self._kill(process)
+            else:
+                buf += chunk
+
     async def execute(self, inputs: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         command = inputs.get("command") or self.config.get("command")
         if not command:
@@ -202,28 +300,68 @@ class ShellNode:
             return {"ok": False, "error": f"Invalid working directory: {self.cwd}"}
 
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.cwd
-            )
+            if self.use_shell:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self.cwd,
+                    start_new_session=True  # own process group, so kills reach grandchildren
+                )
+            else:
+                try:
+                    argv = shlex.split(command)
+                except ValueError as e:
+                    return {"ok": False, "error": f"Invalid command syntax: {e}"}
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self.cwd,
+                    start_new_session=True
+                )
+
+            stdout_buf = bytearray()
+            stderr_buf = bytearray()
+
+            async def _collect() -> bool:
+                results = await asyncio.gather(
+                    self._read_capped(process, process.stdout, stdout_buf),
+                    self._read_capped(process, process.stderr, stderr_buf)
+                )
+                await process.wait()
+                return any(results)
 
             try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+                truncated = await asyncio.wait_for(_collect(), timeout=self.timeout)
             except asyncio.TimeoutError:
-                process.kill()
+                self._kill(process)
                 await process.wait()  # Ensure process is cleaned up
                 return {"ok": False, "error": f"Command timed out after {self.timeout}s"}
 
-            # Limit output size
-            output = stdout[:self.max_output].decode('utf-8', errors='replace').strip()
-            error_output = stderr[:self.max_output].decode('utf-8', errors='replace').strip()
-
-            if len(stdout) > self.max_output or len(stderr) > self.max_output:
+            if truncated:
                 logger.warning("Command output truncated due to size limit")
 
-            if process.returncode == 0:
+            # Raw bytes for callers piping output onward; "output" stays text so
+            # downstream nodes and JSON serialisation keep working
+            if inputs.get("binary", False):
+                stdout_bytes = bytes(stdout_buf)
+                stderr_bytes = bytes(stderr_buf)
+                data = {"stdout_bytes": stdout_bytes, "stderr_bytes": stderr_bytes}
+                summary = f"{len(stdout_bytes)} bytes of binary output"
+                if truncated or process.returncode == 0:
+                    return {"ok": True, "output": summary, "data": data}
+                return {
+                    "ok": False,
+                    "error": stderr_bytes.decode('utf-8', errors='replace').strip() or f"Command failed with code {process.returncode}",
+                    "data": data
+                }
+
+            output = stdout_buf.decode('utf-8', errors='replace').strip()
+            error_output = stderr_buf.decode('utf-8', errors='replace').strip()
+
+            # A truncated command was killed by us, so its exit code is not meaningful
+            if truncated or process.returncode == 0:
                 return {"ok": True, "output": output, "data": {"stdout": output, "stderr": error_output}}
             else:
                 return {
@@ -1,9 +1,118 @@
+import asyncio
+import json
 import logging
 import aiohttp
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Set, Tuple, Hashable, Callable, Awaitable
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so repeated sends reuse pooled keep-alive connections
+# instead of paying a new TCP+TLS handshake per message.
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=_REQUEST_TIMEOUT
+        )
+    return _session
+
+
+async def close_session():
+    """Close the shared session (called on server shutdown)."""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+class _MessageCoalescer:
+    """
+    Merges messages bound for the same destination within a short window.
+
+    Executors are created per node run, so pending batches live at module
+    level keyed by destination. The first caller for a key schedules the
+    flush; every caller awaits a future resolved with the send result.
+    """
+    def __init__(self):
+        self._pending: Dict[Hashable, List[Tuple[str, asyncio.Future]]] = {}
+        # Strong references to in-flight flush tasks so they aren't garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        key: Hashable,
+        text: str,
+        send: Callable[[str], Awaitable[Dict[str, Any]]],
+        window: float,
+        max_chars: int
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(window, self._start_flush, key, send, max_chars)
+        batch.append((text, future))
+        return await future
+
+    def _start_flush(self, key: Hashable, send: Callable[[str], Awaitable[Dict[str, Any]]], max_chars: int):
+        task = asyncio.ensure_future(self._flush(key, send, max_chars))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: Hashable, send: Callable[[str], Awaitable[Dict[str, Any]]], max_chars: int):
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        try:
+            await self._send_batch(batch, send, max_chars)
+        finally:
+            # A cancelled send (BaseException) must not leave callers waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_result({"ok": False, "error": "Batched send was cancelled"})
+
+    @staticmethod
+    async def _send_batch(
+        batch: List[Tuple[str, asyncio.Future]],
+        send: Callable[[str], Awaitable[Dict[str, Any]]],
+        max_chars: int
+    ):
+        # Pack texts into as few messages as the platform length limit allows
+        groups: List[List[Tuple[str, asyncio.Future]]] = []
+        size = max_chars
+        for item in batch:
+            added = len(item[0]) + 1
+            if size + added > max_chars + 1:
+                groups.append([])
+                size = 0
+            groups[-1].append(item)
+            size += added
+
+        for group in groups:
+            try:
+                result = await send("\n".join(text for text, _ in group))
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            for text, future in group:
+                if not future.done():
+                    future.set_result({**result, "output": text} if result.get("ok") else result)
+
+
+_COALESCER = _MessageCoalescer()
+
 class TelegramTrigger:
     """
     Handles communication with Telegram Bot API.
@@ -15,6 +124,10 @@ class TelegramTrigger:
         self.token = config.get("bot_token")
         self.default_chat_id = config.get("chat_id")
         self.base_url = f"https://api.telegram.org/bot{self.token}"
+        self._send_url = f"{self.base_url}/sendMessage"
+        # Optional burst coalescing: messages within the window are joined into one send
+        self.batch = config.get("batch", False)
+        self.batch_window = config.get("batch_window_ms", 100) / 1000
 
     async def execute(self, inputs: Dict[str, Any], context: str = "") -> Dict[str, Any]:
         """Send a message to Telegram."""
@@ -27,22 +140,30 @@ class TelegramTrigger:
         if not chat_id:
             return {"ok": False, "error": "No Chat ID provided"}
 
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/sendMessage"
-            payload = {
-                "chat_id": chat_id,
-                "text": text,
-                "parse_mode": "Markdown"
-            }
-            try:
-                async with session.post(url, json=payload) as resp:
-                    result = await resp.json()
-                    if result.get("ok"):
-                        return {"ok": True, "output": text, "message_id": result["result"]["message_id"]}
-                    else:
-                        return {"ok": False, "error": result.get("description")}
-            except Exception as e:
-                return {"ok": False, "error": str(e)}
+        if self.batch:
+            return await _COALESCER.submit(
+                ("telegram", self._send_url, chat_id), text,
+                lambda combined: self._send(chat_id, combined),
+                self.batch_window, 4096
+            )
+        return await self._send(chat_id, text)
+
+    async def _send(self, chat_id: Any, text: str) -> Dict[str, Any]:
+        session = await _get_session()
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "Markdown"
+        }
+        try:
+            async with session.post(self._send_url, json=payload) as resp:
+                result = _loads(await resp.read())
+                if result.get("ok"):
+                    return {"ok": True, "output": text, "message_id": result["result"]["message_id"]}
+                else:
+                    return {"ok": False, "error": result.get("description")}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
 
 class DiscordTrigger:
     """
@@ -54,36 +175,51 @@ class DiscordTrigger:
         self.webhook_url = config.get("webhook_url")
         self.bot_token = config.get("bot_token")
         self.channel_id = config.get("channel_id")
+        # Bot API endpoint and auth headers are per-instance constants
+        self._bot_url = f"https://discord.com/api/v10/channels/{self.channel_id}/messages" if self.channel_id else None
+        self._headers = {"Authorization": f"Bot {self.bot_token}"} if self.bot_token else None
+        self.batch = config.get("batch", False)
+        self.batch_window = config.get("batch_window_ms", 100) / 1000
+        # Webhook URLs carry their own token; Bot API batches must not mix
+        # callers with different tokens, since one _send posts the whole batch
+        self._batch_key = ("discord", self.webhook_url) if self.webhook_url else ("discord", self._bot_url, self.bot_token)
 
     async def execute(self, inputs: Dict[str, Any], context: str = "") -> Dict[str, Any]:
         """Send a message to Discord."""
         text = inputs.get("text") or context or "No content provided"
-        
+
+        if not (self.webhook_url or (self.bot_token and self.channel_id)):
+            return {"ok": False, "error": "Neither Webhook URL nor Bot Token/Channel ID provided"}
+
+        if self.batch:
+            return await _COALESCER.submit(
+                self._batch_key, text,
+                self._send, self.batch_window, 2000
+            )
+        return await self._send(text)
+
+    async def _send(self, text: str) -> Dict[str, Any]:
         # Priority 1: Webhook
         if self.webhook_url:
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.post(self.webhook_url, json={"content": text}) as resp:
-                        if resp.status in [200, 204]:
-                            return {"ok": True, "output": text}
-                        else:
-                            return {"ok": False, "error": f"Discord Webhook error: {resp.status}"}
-                except Exception as e:
-                    return {"ok": False, "error": str(e)}
+            session = await _get_session()
+            try:
+                async with session.post(self.webhook_url, json={"content": text}) as resp:
+                    if resp.status in [200, 204]:
+                        return {"ok": True, "output": text}
+                    else:
+                        return {"ok": False, "error": f"Discord Webhook error: {resp.status}"}
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
         
         # Priority 2: Bot API
-        elif self.bot_token and self.channel_id:
-            url = f"https://discord.com/api/v10/channels/{self.channel_id}/messages"
-            headers = {"Authorization": f"Bot {self.bot_token}"}
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.post(url, headers=headers, json={"content": text}) as resp:
-                        result = await resp.json()
-                        if resp.status == 200:
-                            return {"ok": True, "output": text}
-                        else:
-                            return {"ok": False, "error": result.get("message", "Unknown error")}
-                except Exception as e:
-                    return {"ok": False, "error": str(e)}
-        
-        return {"ok": False, "error": "Neither Webhook URL nor Bot Token/Channel ID provided"}
+        else:
+            session = await _get_session()
+            try:
+                async with session.post(self._bot_url, headers=self._headers, json={"content": text}) as resp:
+                    result = _loads(await resp.read())
+                    if resp.status == 200:
+                        return {"ok": True, "output": text}
+                    else:
+                        return {"ok": False, "error": result.get("message", "Unknown error")}
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
@@ -9,16 +9,39 @@ Provides:
 """
 
 import os
+import re
+import json
 import time
 import hashlib
 import secrets
 import logging
-from typing import Dict, Optional, Callable, Any
+from array import array
+from types import MappingProxyType
+from typing import Dict, List, Optional, Callable, Any, Mapping
 from functools import wraps
-from collections import defaultdict
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    from fastapi import HTTPException, Request, Security
+    from fastapi.security import APIKeyHeader
+except ImportError:
+    # FastAPI integration is optional
+    HTTPException = Request = Security = APIKeyHeader = None
 
 logger = logging.getLogger(__name__)
 
+# Log redaction patterns, compiled once at import
+_SECRET_RE = re.compile(r'(?i)(api[_-]?key|token|password|secret)["\']?\s*[:=]\s*["\']?[\w\-]+')
+_BEARER_RE = re.compile(r'Bearer\s+[\w\-\.]+')
+_SECRET_KEYWORDS = ('key', 'token', 'password', 'secret')
+# Null byte or parent-directory reference in a path parameter
+_BAD_PATH_RE = re.compile(r'\x00|\.\.')
+
 
 # ============ API Key Management ============
 
@@ -34,8 +57,22 @@ class APIKeyManager:
 
     def __init__(self):
         self._keys: Dict[str, Dict[str, Any]] = {}
+        # SHA-256 digest of each key -> (encoded key, metadata), for O(1) lookup
+        self._by_hash: Dict[bytes, tuple[bytes, Dict[str, Any]]] = {}
         self._enabled = True
         self._load_keys()
+        self._build_index()
+
+    def _build_index(self):
+        """Index loaded keys by their SHA-256 digest, skipping malformed entries."""
+        self._by_hash = {}
+        for key_id, key_data in self._keys.items():
+            key = key_data.get('key') if isinstance(key_data, dict) else None
+            if not isinstance(key, str) or not key:
+                logger.warning(f"Ignoring API key entry '{key_id}': missing or invalid 'key'")
+                continue
+            encoded = key.encode()
+            self._by_hash[hashlib.sha256(encoded).digest()] = (encoded, key_data)
 
     def _load_keys(self):
         """Load API keys from environment or config."""
@@ -54,11 +91,9 @@ class APIKeyManager:
         config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'api_keys.json')
         if os.path.exists(config_path):
             try:
-                import json
-                with open(config_path, 'r') as f:
-                    data = json.load(f)
-                    for key_id, key_data in data.items():
-                        self._keys[key_id] = key_data
+                with open(config_path, 'rb') as f:
+                    data = _loads(f.read())
+                self._keys.update(data)
                 logger.info(f"Loaded {len(self._keys)} API keys from config")
                 return
             except Exception as e:
@@ -98,10 +133,18 @@ class APIKeyManager:
         if not api_key:
             return None
 
-        # Constant-time comparison to prevent timing attacks
-        for key_id, key_data in self._keys.items():
-            if secrets.compare_digest(key_data['key'], api_key):
-                return key_data
+        # Look up by digest, then confirm with one constant-time comparison.
+        # A miss still runs a comparison of the same length, so the work done
+        # does not depend on the number of keys or on which one matched.
+        presented = api_key.encode()
+        entry = self._by_hash.get(hashlib.sha256(presented).digest())
+        if entry is None:
+            secrets.compare_digest(presented, presented)
+            return None
+
+        expected, key_data = entry
+        if secrets.compare_digest(expected, presented):
+            return key_data
 
         return None
 
@@ -125,13 +168,31 @@ class RateLimiter:
     """
     Simple in-memory rate limiter.
 
-    Uses a sliding window approach to limit requests per IP/key.
+    Uses token buckets to limit requests per IP/key: one refilling at
+    requests_per_minute over a minute, and a burst bucket refilling
+    burst_limit tokens per second. Bucket state is packed into a flat
+    array of doubles, three per identifier.
     """
 
     def __init__(self, requests_per_minute: int = 60, burst_limit: int = 10):
         self.requests_per_minute = requests_per_minute
         self.burst_limit = burst_limit
-        self._requests: Dict[str, list] = defaultdict(list)
+        self._rate = requests_per_minute / 60  # tokens per second
+        # identifier -> offset into _state of (tokens, burst_tokens, last_update)
+        self._slots: Dict[str, int] = {}
+        self._state = array('d')
+        self._free: List[int] = []
+        self._calls = 0
+
+    def _evict_idle(self, now: float):
+        """Drop identifiers idle long enough that both buckets are full again."""
+        # Buckets refill completely within a minute, so such entries are
+        # indistinguishable from a first request
+        cutoff = now - 60
+        state = self._state
+        idle = [k for k, slot in self._slots.items() if state[slot + 2] <= cutoff]
+        for k in idle:
+            self._free.append(self._slots.pop(k))
 
     def is_allowed(self, identifier: str) -> tuple[bool, Dict[str, Any]]:
         """
@@ -141,42 +202,59 @@ class RateLimiter:
             (allowed, metadata) where metadata contains rate limit info
         """
         now = time.time()
-        window_start = now - 60  # 1 minute window
-
-        # Clean old requests
-        self._requests[identifier] = [
-            t for t in self._requests[identifier]
-            if t > window_start
-        ]
-
-        requests_in_window = len(self._requests[identifier])
-
-        # Check burst limit (requests in last second)
-        recent_requests = sum(1 for t in self._requests[identifier] if t > now - 1)
+        self._calls += 1
+        if self._calls % 1024 == 0:
+            self._evict_idle(now)
+
+        limit = self.requests_per_minute
+        burst_limit = self.burst_limit
+        rate = self._rate
+
+        state = self._state
+        slot = self._slots.get(identifier)
+        if slot is None:
+            tokens, burst = float(limit), float(burst_limit)
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(state)
+                state.extend((0.0, 0.0, 0.0))
+            self._slots[identifier] = slot
+        else:
+            tokens, burst = state[slot], state[slot + 1]
+            elapsed = now - state[slot + 2]
+            tokens = min(limit, tokens + elapsed * rate)
+            burst = min(burst_limit, burst + elapsed * burst_limit)
 
         metadata = {
-            'limit': self.requests_per_minute,
-            'remaining': max(0, self.requests_per_minute - requests_in_window),
-            'reset': int(window_start + 60)
+            'limit': limit,
+            'remaining': int(tokens),
+            'reset': int(now + (limit - tokens) / rate) if rate else int(now)
         }
 
-        if recent_requests >= self.burst_limit:
+        allowed = False
+        if burst < 1:
             logger.warning(f"Burst limit exceeded for {identifier}")
-            return False, metadata
-
-        if requests_in_window >= self.requests_per_minute:
+        elif tokens < 1:
             logger.warning(f"Rate limit exceeded for {identifier}")
-            return False, metadata
-
-        # Record this request
-        self._requests[identifier].append(now)
+        else:
+            # Record this request
+            tokens -= 1
+            burst -= 1
+            allowed = True
 
-        return True, metadata
+        state[slot] = tokens
+        state[slot + 1] = burst
+        state[slot + 2] = now
+        return allowed, metadata
 
 
 # Global rate limiter
 rate_limiter = RateLimiter()
 
+# Limiters shared by rate limit dependencies, keyed by requests_per_minute
+_shared_limiters: Dict[int, RateLimiter] = {rate_limiter.requests_per_minute: rate_limiter}
+
 
 # ============ Input Validation ============
 
@@ -190,12 +268,11 @@ def validate_path_param(path: str, allow_absolute: bool = False) -> tuple[bool,
     if not path:
         return False, "Empty path"
 
-    # Check for null bytes
-    if '\x00' in path:
-        return False, "Null byte in path"
-
-    # Check for path traversal
-    if '..' in path:
+    # Null bytes and traversal in a single scan; only a rejected path is
+    # looked at again to pick the message
+    if _BAD_PATH_RE.search(path):
+        if '\x00' in path:
+            return False, "Null byte in path"
         return False, "Path traversal not allowed"
 
     # Check for absolute paths
@@ -208,8 +285,6 @@ def validate_path_param(path: str, allow_absolute: bool = False) -> tuple[bool,
 
 def sanitize_log_message(message: str, max_length: int = 1000) -> str:
     """Sanitize a message for logging (remove sensitive data patterns)."""
-    import re
-
     if not message:
         return ""
 
@@ -217,12 +292,15 @@ def sanitize_log_message(message: str, max_length: int = 1000) -> str:
     if len(message) > max_length:
         message = message[:max_length] + "...[truncated]"
 
-    # Mask potential API keys
-    message = re.sub(r'(?i)(api[_-]?key|token|password|secret)["\']?\s*[:=]\s*["\']?[\w\-]+',
-                     r'\1=***REDACTED***', message)
+    # Mask potential API keys (most lines contain none of the keywords,
+    # so a plain substring check avoids entering the regex engine)
+    lowered = message.lower()
+    if any(k in lowered for k in _SECRET_KEYWORDS):
+        message = _SECRET_RE.sub(r'\1=***REDACTED***', message)
 
     # Mask Bearer tokens
-    message = re.sub(r'Bearer\s+[\w\-\.]+', 'Bearer ***REDACTED***', message)
+    if 'Bearer' in message:
+        message = _BEARER_RE.sub('Bearer ***REDACTED***', message)
 
     return message
 
@@ -238,9 +316,13 @@ SECURITY_HEADERS = {
 }
 
 
-def get_security_headers() -> Dict[str, str]:
-    """Get security headers to add to responses."""
-    return SECURITY_HEADERS.copy()
+# Read-only view handed out per response; copy it if you need to modify
+_FROZEN_HEADERS: Mapping[str, str] = MappingProxyType(SECURITY_HEADERS)
+
+
+def get_security_headers() -> Mapping[str, str]:
+    """Get security headers to add to responses (read-only)."""
+    return _FROZEN_HEADERS
 
 
 # ============ FastAPI Integration ============
@@ -259,9 +341,6 @@ def create_auth_dependency():
         async def protected_endpoint(auth_data: dict = Depends(auth)):
             return {"user": auth_data['name']}
     """
-    from fastapi import HTTPException, Security
-    from fastapi.security import APIKeyHeader
-
     api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
     async def verify_api_key(api_key: str = Security(api_key_header)):
@@ -286,10 +365,14 @@ def create_auth_dependency():
     return verify_api_key
 
 
-def create_rate_limit_dependency(requests_per_minute: int = 60):
+def create_rate_limit_dependency(requests_per_minute: int = 60, limiter: Optional[RateLimiter] = None):
     """
     Create a FastAPI dependency for rate limiting.
 
+    Dependencies created with the same requests_per_minute share one
+    limiter, so per-client counts hold across routers. Pass `limiter`
+    to use a specific instance instead.
+
     Usage:
         from fastapi import Depends, Request
         from core.security import create_rate_limit_dependency
@@ -300,9 +383,10 @@ def create_rate_limit_dependency(requests_per_minute: int = 60):
         async def limited_endpoint(request: Request, _: None = Depends(rate_limit)):
             return {"status": "ok"}
     """
-    from fastapi import HTTPException, Request
-
-    limiter = RateLimiter(requests_per_minute=requests_per_minute)
+    if limiter is None:
+        limiter = _shared_limiters.get(requests_per_minute)
+        if limiter is None:
+            limiter = _shared_limiters[requests_per_minute] = RateLimiter(requests_per_minute=requests_per_minute)
 
     async def check_rate_limit(request: Request):
         # Use client IP as identifier
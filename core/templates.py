@@ -1,7 +1,12 @@
-import uuid
+import copy
+import functools
+import secrets
 from typing import List, Dict, Any
 from .workflow import NodeType, NodeStatus
 
+# Templates hold plain strings so they serialize without enum handling
+_IDLE = NodeStatus.IDLE.value
+
 class TemplateLibrary:
     """
     Registry of high-value workflow templates.
@@ -9,21 +14,18 @@ class TemplateLibrary:
     
     @staticmethod
     def get_templates() -> List[Dict[str, Any]]:
-        return [
-            TemplateLibrary.social_media_manager(),
-            TemplateLibrary.deep_research_analyst(),
-            TemplateLibrary.customer_support_triage()
-        ]
+        # Built once; callers get their own copy so mutations don't leak
+        return copy.deepcopy(_build_templates())
 
     @staticmethod
     def _create_node(name: str, type: NodeType, x: int, y: int, persona: str = None, provider_config: Dict = None) -> Dict[str, Any]:
         return {
-            "id": str(uuid.uuid4())[:8],
+            "id": secrets.token_hex(4),
             "name": name,
-            "type": type,
+            "type": type.value,
             "x": x,
             "y": y,
-            "status": NodeStatus.IDLE,
+            "status": _IDLE,
             "persona": persona or "",
             "provider_config": provider_config or {}
         }
@@ -31,7 +33,7 @@ class TemplateLibrary:
     @staticmethod
     def _connect(source_id: str, target_id: str) -> Dict[str, Any]:
         return {
-            "id": str(uuid.uuid4())[:8],
+            "id": secrets.token_hex(4),
             "source": source_id,
             "target": target_id,
             "type": "default"
@@ -200,3 +202,12 @@ class TemplateLibrary:
             "nodes": {n["id"]: n for n in nodes},
             "edges": edges
         }
+
+
+@functools.lru_cache(maxsize=1)
+def _build_templates() -> List[Dict[str, Any]]:
+    return [
+        TemplateLibrary.social_media_manager(),
+        TemplateLibrary.deep_research_analyst(),
+        TemplateLibrary.customer_support_triage()
+    ]
@@ -3,23 +3,147 @@ import shlex
 import logging
 import re
 import os
+import time
+import atexit
+import signal
+import secrets
+import selectors
+import threading
 from typing import Dict, Any, List, Union
 
 logger = logging.getLogger(__name__)
 
 # Blocked commands that could be dangerous
-BLOCKED_COMMANDS = {
+BLOCKED_COMMANDS = frozenset({
     'rm -rf /',
     'rm -rf /*',
     'mkfs',
     'dd if=/dev/zero',
     ':(){:|:&};:',  # Fork bomb
-}
+})
+# All blocked substrings in one case-insensitive alternation
+_BLOCKED_RE = re.compile('|'.join(re.escape(p) for p in BLOCKED_COMMANDS), re.IGNORECASE)
 
 # Allowed commands whitelist (optional, can be enabled for stricter security)
 ALLOWED_COMMAND_PREFIXES = None  # Set to a list like ['git', 'python', 'npm'] to restrict
 
 
+class _ShellPool:
+    """
+    Long-lived /bin/sh workers for shell-mode commands, pooled per cwd (POSIX only).
+
+    Each command runs in a subshell of an idle worker, so repeated calls skip
+    spawning a fresh shell. Output on both streams is delimited by a random
+    end marker the worker prints once the command exits.
+    """
+    MAX_IDLE_PER_CWD = 4
+
+    def __init__(self):
+        self._idle: Dict[str, List[subprocess.Popen]] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _acquire(self, cwd: str) -> subprocess.Popen:
+        with self._lock:
+            idle = self._idle.get(cwd)
+            while idle:
+                proc = idle.pop()
+                if proc.poll() is None:
+                    return proc
+        return subprocess.Popen(
+            ['/bin/sh'],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+
+    def _release(self, cwd: str, proc: subprocess.Popen):
+        with self._lock:
+            idle = self._idle.setdefault(cwd, [])
+            if len(idle) < self.MAX_IDLE_PER_CWD:
+                idle.append(proc)
+                return
+        self._terminate(proc)
+
+    @staticmethod
+    def _terminate(proc: subprocess.Popen):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        proc.wait()
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            stream.close()
+
+    def close(self):
+        """Terminate all idle workers."""
+        with self._lock:
+            workers = [proc for idle in self._idle.values() for proc in idle]
+            self._idle.clear()
+        for proc in workers:
+            self._terminate(proc)
+
+    def run(self, command: str, cwd: str, timeout: int) -> subprocess.CompletedProcess:
+        cwd = os.path.abspath(cwd)
+        proc = self._acquire(cwd)
+        marker = f"__MAO_END_{secrets.token_hex(8)}__"
+        # Subshell keeps cd/exit/variables from leaking into the worker;
+        # stdin is detached so the command cannot read our next script
+        script = (
+            f"( {command}\n) </dev/null\n"
+            f"printf '{marker}%d\\n' $?\n"
+            f"printf '{marker}\\n' >&2\n"
+        )
+        end = marker.encode()
+        buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+
+        try:
+            proc.stdin.write(script.encode())
+            proc.stdin.flush()
+
+            deadline = time.monotonic() + timeout
+            with selectors.DefaultSelector() as selector:
+                for stream in buffers:
+                    selector.register(stream, selectors.EVENT_READ)
+                pending = len(buffers)
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(command, timeout)
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, 65536)
+                        if not chunk:
+                            raise OSError("Shell worker exited unexpectedly")
+                        buf = buffers[key.fileobj]
+                        start = max(0, len(buf) - len(end))
+                        buf += chunk
+                        pos = buf.find(end, start)
+                        if pos >= 0 and buf.find(b"\n", pos) >= 0:
+                            selector.unregister(key.fileobj)
+                            pending -= 1
+        except BaseException:
+            # Worker state is unknown (timed out, died, interrupted) - discard it
+            self._terminate(proc)
+            raise
+
+        self._release(cwd, proc)
+
+        out, err = buffers[proc.stdout], buffers[proc.stderr]
+        out_end = out.find(end)
+        returncode = int(out[out_end + len(end):out.find(b"\n", out_end)])
+        return subprocess.CompletedProcess(
+            command,
+            returncode,
+            out[:out_end].decode('utf-8', errors='replace'),
+            err[:err.find(end)].decode('utf-8', errors='replace')
+        )
+
+
+_SHELL_POOL = _ShellPool() if os.name == 'posix' else None
+
+
 class CLITool:
     """
     Executes shell commands on the host system.
@@ -35,25 +159,24 @@ class CLITool:
     @staticmethod
     def _validate_command(command: str) -> bool:
         """Validate command against blocked patterns."""
-        command_lower = command.lower().strip()
-
         # Check blocked commands
-        for blocked in BLOCKED_COMMANDS:
-            if blocked in command_lower:
-                logger.warning(f"Blocked dangerous command pattern: {command}")
-                return False
+        if _BLOCKED_RE.search(command):
+            logger.warning(f"Blocked dangerous command pattern: {command}")
+            return False
 
         # Check whitelist if enabled
         if ALLOWED_COMMAND_PREFIXES is not None:
-            first_word = command_lower.split()[0] if command_lower else ''
-            if not any(first_word.startswith(prefix) for prefix in ALLOWED_COMMAND_PREFIXES):
+            parts = command.lower().split(None, 1)
+            first_word = parts[0] if parts else ''
+            if not first_word.startswith(tuple(ALLOWED_COMMAND_PREFIXES)):
                 logger.warning(f"Command not in whitelist: {command}")
                 return False
 
         return True
 
     @staticmethod
-    def execute(command: str, cwd: str = ".", use_shell: bool = True, timeout: int = 60) -> Dict[str, Any]:
+    def execute(command: str, cwd: str = ".", use_shell: bool = True, timeout: int = 60,
+                persistent: bool = False) -> Dict[str, Any]:
         """
         Runs a command and returns the output.
 
@@ -62,6 +185,9 @@ class CLITool:
             cwd: Working directory
             use_shell: If False, parses command into args list (safer but no pipes/redirects)
             timeout: Command timeout in seconds
+            persistent: In shell mode, run on a pooled long-lived shell instead of
+                spawning one per call (POSIX only). The worker's environment is
+                fixed when it starts and the command's stdin is /dev/null.
         """
         # Validate working directory
         if not os.path.isdir(cwd):
@@ -74,7 +200,9 @@ class CLITool:
         logger.info(f"Executing CLI command: {command} in {cwd}")
 
         try:
-            if use_shell:
+            if use_shell and persistent and _SHELL_POOL is not None:
+                result = _SHELL_POOL.run(command, cwd, timeout)
+            elif use_shell:
                 # Shell mode - needed for pipes, redirects, etc.
                 # Less secure but more flexible
                 result = subprocess.run(
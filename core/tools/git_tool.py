@@ -1,12 +1,196 @@
 import logging
 import os
 import re
-import shlex
+import string
+import time
+import atexit
+import copy
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from .cli import CLITool
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Control characters stripped from commit messages (newlines/tabs are kept)
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f])
+
+# Accepted git URL forms, as one anchored alternation. Hosts and path
+# segments use dot/slash-separated repeats whose character classes do not
+# overlap with the separator, so matching stays linear on hostile input.
+_URL_HOST = r'[\w-]+(?:\.[\w-]+)*(?::\d+)?'
+_URL_SEGMENT = r'(?:/[\w.-]+)'
+_REPO_URL_RE = re.compile(
+    r'^(?:'
+    rf'https?://{_URL_HOST}{_URL_SEGMENT}+/?'                                     # HTTPS (with or without .git)
+    rf'|(?:git://|ssh://(?:[\w.-]+@)?){_URL_HOST}{_URL_SEGMENT}+(?<=\.git)'      # Git protocol / SSH explicit
+    rf'|git@[\w-]+(?:\.[\w-]+)*:[\w.-]+{_URL_SEGMENT}*(?<=\.git)'               # SSH
+    r')$',
+    re.IGNORECASE
+)
+_MAX_REPO_URL_LENGTH = 512
+
+_IS_NT = os.name == 'nt'
+_DRIVE_LETTERS = frozenset(string.ascii_letters)
+# Punctuation allowed in branch names besides letters and digits
+_BRANCH_PUNCT = str.maketrans('', '', '_-/')
+
+# Long-lived `git cat-file --batch` readers, one per repository per thread
+_batch_local = threading.local()
+_batch_procs: List[subprocess.Popen] = []
+_batch_procs_lock = threading.Lock()
+
+
+def _close_batch_readers():
+    """Close all cat-file readers (registered with atexit)."""
+    with _batch_procs_lock:
+        procs = list(_batch_procs)
+        _batch_procs.clear()
+    for proc in procs:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
+atexit.register(_close_batch_readers)
+
+
+# Environment for read-only git calls: no optional index locks, and the C
+# locale so git skips message translation. Built once from the startup env.
+_READ_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+
+
+def _git_read(args: List[str], cwd: str, timeout: int = 30) -> Dict[str, Any]:
+    """Run a read-only git command directly (same result shape as CLITool.execute_safe)."""
+    if not os.path.isdir(cwd):
+        return {"success": False, "error": f"Invalid working directory: {cwd}"}
+    try:
+        result = subprocess.run(
+            args,
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=_READ_ENV
+        )
+        return {
+            "success": result.returncode == 0,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "returncode": result.returncode
+        }
+    except subprocess.TimeoutExpired:
+        return {"success": False, "error": f"Command timed out ({timeout}s limit)"}
+    except Exception as e:
+        logger.error(f"Git Error: {e}")
+        return {"success": False, "error": str(e)}
+
+
+class _RepoStateCache:
+    """
+    Caches read-only git results per repository.
+
+    Entries are keyed on a fingerprint of .git/index, HEAD and the checked-out
+    ref, so commits, checkouts and staging invalidate them. Working-tree edits
+    don't touch .git, so callers can also bound an entry's age with a TTL.
+    Results are deep-copied in and out, since status entries and branch info
+    are nested and callers are free to mutate what they get back.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(repo: str) -> Optional[tuple]:
+        git_dir = os.path.join(repo, '.git')
+        head_path = os.path.join(git_dir, 'HEAD')
+        try:
+            head_mtime = os.stat(head_path).st_mtime_ns
+            with open(head_path, 'rb') as f:
+                head = f.read().strip()
+        except OSError:
+            # Not a repository root, or .git is a file (worktree/submodule)
+            return None
+
+        def mtime(*parts: str) -> int:
+            try:
+                return os.stat(os.path.join(git_dir, *parts)).st_mtime_ns
+            except OSError:
+                return 0
+
+        ref_mtime = mtime(head[5:].decode(errors='replace')) if head.startswith(b'ref: ') else 0
+        return (head, head_mtime, ref_mtime, mtime('index'), mtime('packed-refs'))
+
+    def get(self, repo: str, key: tuple, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((repo,) + key)
+        if entry is None:
+            return None
+        fingerprint, stored_at, result = entry
+        if ttl is not None and time.monotonic() - stored_at > ttl:
+            return None
+        if fingerprint is None or fingerprint != self._fingerprint(repo):
+            return None
+        return copy.deepcopy(result)
+
+    def put(self, repo: str, key: tuple, result: Dict[str, Any]):
+        fingerprint = self._fingerprint(repo)
+        if fingerprint is None or not result.get("success"):
+            return
+        with self._lock:
+            self._entries[(repo,) + key] = (fingerprint, time.monotonic(), copy.deepcopy(result))
+
+    def invalidate(self, repo: str):
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == repo]:
+                del self._entries[k]
+
+
+_repo_cache = _RepoStateCache()
+
+# Upper bound on how stale a cached `git status` may be
+_STATUS_CACHE_TTL = 2.0
+
+
+def _parse_porcelain_v2(output: str) -> tuple:
+    """
+    Parse `git status --porcelain=v2 --branch -z` output.
+
+    Returns (branch, entries): branch holds the "# branch.*" headers and each
+    entry is {"path", "xy", "orig_path"} (orig_path is set for renames/copies).
+    """
+    branch: Dict[str, Any] = {}
+    entries: List[Dict[str, Any]] = []
+    records = iter(output.split('\x00'))
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+        if kind == '#':
+            _, key, value = record.split(' ', 2)
+            if key == 'branch.ab':
+                ahead, behind = value.split()
+                branch["ahead"], branch["behind"] = int(ahead), -int(behind)
+            else:
+                branch[key[len('branch.'):]] = value
+        elif kind == '1':
+            parts = record.split(' ', 8)
+            entries.append({"path": parts[8], "xy": parts[1], "orig_path": None})
+        elif kind == '2':
+            # Rename/copy: the original path follows as its own NUL-terminated field
+            parts = record.split(' ', 9)
+            entries.append({"path": parts[9], "xy": parts[1], "orig_path": next(records, None)})
+        elif kind == 'u':
+            parts = record.split(' ', 10)
+            entries.append({"path": parts[10], "xy": parts[1], "orig_path": None})
+        elif kind in '?!':
+            entries.append({"path": record[2:], "xy": kind * 2, "orig_path": None})
+    return branch, entries
+
 
 def _sanitize_git_message(message: str) -> str:
     """
@@ -17,7 +201,7 @@ def _sanitize_git_message(message: str) -> str:
         return "No message provided"
 
     # Remove null bytes and other control characters (except newlines/tabs)
-    message = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', message)
+    message = message.translate(_CTRL_TABLE)
 
     # Limit message length to prevent buffer issues
     max_length = 5000
@@ -32,18 +216,9 @@ def _validate_repo_url(url: str) -> bool:
     if not url:
         return False
 
-    # Allow common git URL patterns
-    valid_patterns = [
-        r'^https?://[\w\-\.]+/[\w\-\./]+\.git$',  # HTTPS
-        r'^https?://[\w\-\.]+/[\w\-\./]+$',        # HTTPS without .git
-        r'^git@[\w\-\.]+:[\w\-\./]+\.git$',        # SSH
-        r'^git://[\w\-\.]+/[\w\-\./]+\.git$',      # Git protocol
-        r'^ssh://[\w\-@\.]+/[\w\-\./]+\.git$',     # SSH explicit
-    ]
-
-    for pattern in valid_patterns:
-        if re.match(pattern, url, re.IGNORECASE):
-            return True
+    # Allow common git URL patterns (length-capped before matching)
+    if len(url) <= _MAX_REPO_URL_LENGTH and _REPO_URL_RE.match(url):
+        return True
 
     logger.warning(f"Invalid or potentially dangerous git URL: {url}")
     return False
@@ -57,7 +232,8 @@ def _validate_path(path: str) -> bool:
     # Prevent path traversal
     if '..' in path or path.startswith('/') or ':' in path:
         # Allow absolute paths on Windows (C:\...)
-        if os.name == 'nt' and re.match(r'^[a-zA-Z]:\\', path):
+        if (_IS_NT and len(path) >= 3 and path[1] == ':' and path[2] == '\\'
+                and path[0] in _DRIVE_LETTERS):
             return True
         logger.warning(f"Potentially dangerous path: {path}")
         return False
@@ -78,10 +254,63 @@ class GitTool:
     """
 
     @staticmethod
-    def status(cwd: str = ".") -> Dict[str, Any]:
+    def status(cwd: str = ".", include_untracked: bool = True, ahead_behind: bool = True) -> Dict[str, Any]:
+        """
+        Show working tree status.
+
+        include_untracked=False skips the untracked-file scan and
+        ahead_behind=False skips counting commits against upstream; both
+        make status much cheaper on large trees.
+        """
         if not _validate_path(cwd):
             return {"success": False, "error": "Invalid working directory path"}
-        return CLITool.execute_safe(["git", "status"], cwd)
+
+        # Read-only poll: don't take the index lock to refresh stat info
+        args = ["git", "--no-optional-locks", "status"]
+        if not include_untracked:
+            args.append("--untracked-files=no")
+        if not ahead_behind:
+            args.append("--no-ahead-behind")
+
+        repo = os.path.realpath(cwd)
+        key = ("status", include_untracked, ahead_behind)
+        cached = _repo_cache.get(repo, key, ttl=_STATUS_CACHE_TTL)
+        if cached is not None:
+            return cached
+        result = _git_read(args, cwd)
+        _repo_cache.put(repo, key, result)
+        return result
+
+    @staticmethod
+    def status_entries(cwd: str = ".", include_untracked: bool = True, ahead_behind: bool = True) -> Dict[str, Any]:
+        """
+        Structured working tree status from `git status --porcelain=v2 -z`.
+
+        Returns {"success", "branch": {head, oid, upstream, ahead, behind},
+        "entries": [{path, xy, orig_path}, ...]}; no text parsing needed downstream.
+        """
+        if not _validate_path(cwd):
+            return {"success": False, "error": "Invalid working directory path"}
+
+        args = ["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"]
+        if not include_untracked:
+            args.append("--untracked-files=no")
+        if not ahead_behind:
+            args.append("--no-ahead-behind")
+
+        repo = os.path.realpath(cwd)
+        key = ("status_entries", include_untracked, ahead_behind)
+        cached = _repo_cache.get(repo, key, ttl=_STATUS_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+        res = _git_read(args, cwd)
+        if not res["success"]:
+            return res
+        branch, entries = _parse_porcelain_v2(res["stdout"])
+        result = {"success": True, "branch": branch, "entries": entries}
+        _repo_cache.put(repo, key, result)
+        return result
 
     @staticmethod
     def log(cwd: str = ".", limit: int = 5) -> Dict[str, Any]:
@@ -96,7 +325,83 @@ class GitTool:
         except (ValueError, TypeError):
             limit = 5
 
-        return CLITool.execute_safe(["git", "log", "-n", str(limit), "--oneline"], cwd)
+        repo = os.path.realpath(cwd)
+        cached = _repo_cache.get(repo, ("log", limit))
+        if cached is not None:
+            return cached
+        result = _git_read(["git", "log", "-n", str(limit), "--oneline"], cwd)
+        _repo_cache.put(repo, ("log", limit), result)
+        return result
+
+    @staticmethod
+    def snapshot(cwd: str = ".") -> Dict[str, Any]:
+        """Status, recent log and branch list together, fetched concurrently."""
+        if not _validate_path(cwd):
+            return {"success": False, "error": "Invalid working directory path"}
+
+        # Each call blocks in subprocess.run with the GIL released, so the
+        # wall time is that of the slowest git command
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            status, log, branches = pool.map(lambda f: f(cwd), (GitTool.status, GitTool.log, GitTool.branch))
+
+        return {
+            "success": status["success"] and log["success"] and branches["success"],
+            "status": status,
+            "log": log,
+            "branch": branches
+        }
+
+    @staticmethod
+    def _batch_reader(cwd: str) -> subprocess.Popen:
+        """Return this thread's `git cat-file --batch` process for the repo at cwd."""
+        readers = getattr(_batch_local, "readers", None)
+        if readers is None:
+            readers = _batch_local.readers = {}
+        key = os.path.realpath(cwd)
+        proc = readers.get(key)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=key,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            readers[key] = proc
+            with _batch_procs_lock:
+                # Drop readers that have exited so respawns don't accumulate
+                _batch_procs[:] = [p for p in _batch_procs if p.poll() is None]
+                _batch_procs.append(proc)
+        return proc
+
+    @staticmethod
+    def show(rev: str, path: str, cwd: str = ".") -> Dict[str, Any]:
+        """Read a file's contents at a revision (e.g. show("HEAD", "README.md"))."""
+        if not _validate_path(cwd):
+            return {"success": False, "error": "Invalid working directory path"}
+        # A leading "-" would reach the git show fallback as an option
+        if not rev or rev.startswith('-') or '\n' in rev or '\n' in path:
+            return {"success": False, "error": "Invalid revision or path"}
+
+        spec = f"{rev}:{path}"
+        try:
+            proc = GitTool._batch_reader(cwd)
+            proc.stdin.write(spec.encode() + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if not header:
+                raise OSError("git cat-file exited")
+            if len(header) != 3:
+                # "<spec> missing" / "<spec> ambiguous"
+                return {"success": False, "error": f"Object not found: {spec}"}
+            size = int(header[2])
+            content = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            return {"success": True, "stdout": content.decode('utf-8', errors='replace'), "type": header[1].decode()}
+        except (OSError, ValueError) as e:
+            # Reader died or could not start - fall back to a one-off git show
+            logger.debug(f"git cat-file reader unavailable, using git show: {e}")
+            return CLITool.execute_safe(["git", "show", spec], cwd)
 
     @staticmethod
     def clone(repo_url: str, target_dir: str = None) -> Dict[str, Any]:
@@ -123,26 +428,40 @@ class GitTool:
         # Sanitize commit message
         message = _sanitize_git_message(message)
 
-        # Stage all files using safe execution
-        add_res = CLITool.execute_safe(["git", "add", "-A"], cwd)
-        if not add_res["success"]:
-            return add_res
+        if os.name == 'nt':
+            # Stage all files using safe execution
+            add_res = CLITool.execute_safe(["git", "add", "-A"], cwd)
+            if not add_res["success"]:
+                _repo_cache.invalidate(os.path.realpath(cwd))
+                return add_res
 
-        # Commit with message as argument (safe from injection)
-        return CLITool.execute_safe(["git", "commit", "-m", message], cwd)
+            # Commit with message as argument (safe from injection)
+            result = CLITool.execute_safe(["git", "commit", "-m", message], cwd)
+        else:
+            # Stage and commit in one process; the message is passed as a
+            # positional parameter ($1), never interpolated into the script
+            result = CLITool.execute_safe(
+                ["/bin/sh", "-c", 'git add -A && git commit -m "$1"', "sh", message], cwd
+            )
+        _repo_cache.invalidate(os.path.realpath(cwd))
+        return result
 
     @staticmethod
     def push(cwd: str = ".") -> Dict[str, Any]:
         if not _validate_path(cwd):
             return {"success": False, "error": "Invalid working directory path"}
-        return CLITool.execute_safe(["git", "push"], cwd)
+        result = CLITool.execute_safe(["git", "push"], cwd)
+        _repo_cache.invalidate(os.path.realpath(cwd))
+        return result
 
     @staticmethod
     def pull(cwd: str = ".") -> Dict[str, Any]:
         """Pull latest changes from remote."""
         if not _validate_path(cwd):
             return {"success": False, "error": "Invalid working directory path"}
-        return CLITool.execute_safe(["git", "pull"], cwd)
+        result = CLITool.execute_safe(["git", "pull"], cwd)
+        _repo_cache.invalidate(os.path.realpath(cwd))
+        return result
 
     @staticmethod
     def branch(cwd: str = ".", branch_name: str = None) -> Dict[str, Any]:
@@ -152,8 +471,11 @@ class GitTool:
 
         if branch_name:
             # Validate branch name (alphanumeric, dashes, underscores, slashes)
-            if not re.match(r'^[\w\-/]+$', branch_name):
+            stripped = branch_name.translate(_BRANCH_PUNCT)
+            if stripped and not stripped.isalnum():
                 return {"success": False, "error": "Invalid branch name"}
-            return CLITool.execute_safe(["git", "branch", branch_name], cwd)
+            result = CLITool.execute_safe(["git", "branch", branch_name], cwd)
+            _repo_cache.invalidate(os.path.realpath(cwd))
+            return result
         else:
-            return CLITool.execute_safe(["git", "branch"], cwd)
+            return _git_read(["git", "branch"], cwd)
@@ -1,8 +1,70 @@
+import importlib.util
+import json
 import logging
+import operator
+import os
+import threading
 from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
+# Sidecar recording completed snapshot downloads: "<repo_id>|<local_dir>" -> {path, revision}
+_SNAPSHOT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mao", "hf_snapshots.json")
+_snapshot_lock = threading.Lock()
+
+# search_models result keys and the ModelInfo attributes they come from
+_SEARCH_FIELDS = ("id", "likes", "downloads", "pipeline")
+_get_search_fields = operator.attrgetter("modelId", "likes", "downloads", "pipeline_tag")
+_MAX_SEARCH_LIMIT = 100
+
+# Parallel file fetches per snapshot download (network-bound, not CPU-bound)
+_DOWNLOAD_WORKERS = 16
+
+# huggingface_hub is optional; imported on first use and reused afterwards
+_hub = None
+_api = None
+
+
+def _get_hub():
+    """Return the huggingface_hub module (raises ImportError if not installed)."""
+    global _hub
+    if _hub is None:
+        # The Rust downloader is picked up from the environment at import
+        # time, so enable it before importing, and only if it is installed
+        if importlib.util.find_spec("hf_transfer") is not None:
+            os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+        import huggingface_hub
+        _hub = huggingface_hub
+    return _hub
+
+
+def _get_api():
+    """Return a shared HfApi client."""
+    global _api
+    if _api is None:
+        _api = _get_hub().HfApi()
+    return _api
+
+
+def _load_snapshot_index() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(_SNAPSHOT_INDEX_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_snapshot_index(index: Dict[str, Dict[str, str]]):
+    try:
+        os.makedirs(os.path.dirname(_SNAPSHOT_INDEX_PATH), exist_ok=True)
+        tmp_path = f"{_SNAPSHOT_INDEX_PATH}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _SNAPSHOT_INDEX_PATH)
+    except OSError as e:
+        logger.warning(f"Could not update HF snapshot index: {e}")
+
+
 class HFTool:
     """
     Wrapper for Hugging Face Hub operations.
@@ -12,18 +74,9 @@ class HFTool:
     @staticmethod
     def search_models(query: str, limit: int = 5) -> List[Dict[str, Any]]:
         try:
-            from huggingface_hub import HfApi
-            api = HfApi()
-            models = api.list_models(search=query, limit=limit, sort="downloads", direction=-1)
-            results = []
-            for m in models:
-                results.append({
-                    "id": m.modelId,
-                    "likes": m.likes,
-                    "downloads": m.downloads,
-                    "pipeline": m.pipeline_tag
-                })
-            return results
+            limit = max(1, min(int(limit), _MAX_SEARCH_LIMIT))
+            models = _get_api().list_models(search=query, limit=limit, sort="downloads", direction=-1)
+            return [dict(zip(_SEARCH_FIELDS, _get_search_fields(m))) for m in models]
         except ImportError:
             return [{"error": "huggingface_hub library not installed"}]
         except Exception as e:
@@ -31,11 +84,38 @@ class HFTool:
             return [{"error": str(e)}]
             
     @staticmethod
-    def download_model(repo_id: str, local_dir: str = None) -> Dict[str, Any]:
+    def download_model(repo_id: str, local_dir: str = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Download a model snapshot.
+
+        A snapshot already fetched for the same repo_id/local_dir is returned
+        from the local index without contacting the Hub; pass refresh=True
+        to re-resolve the latest revision.
+        """
+        key = f"{repo_id}|{local_dir or ''}"
+        if not refresh:
+            with _snapshot_lock:
+                entry = _load_snapshot_index().get(key)
+            if entry and os.path.isdir(entry.get("path", "")):
+                return {"success": True, "path": entry["path"], "revision": entry.get("revision"), "cached": True}
+
         try:
-            from huggingface_hub import snapshot_download
+            # Pin the revision once so per-file ETag checks are skipped
+            revision = _get_api().model_info(repo_id).sha
             ignore_patterns = ["*.msgpack", "*.h5", "*.ot"] # Skip some large non-safetensor formats if desired
-            path = snapshot_download(repo_id=repo_id, local_dir=local_dir, ignore_patterns=ignore_patterns)
-            return {"success": True, "path": path}
+            path = _get_hub().snapshot_download(
+                repo_id=repo_id,
+                revision=revision,
+                local_dir=local_dir,
+                ignore_patterns=ignore_patterns,
+                max_workers=_DOWNLOAD_WORKERS,
+                etag_timeout=2
+            )
         except Exception as e:
              return {"success": False, "error": str(e)}
+
+        with _snapshot_lock:
+            index = _load_snapshot_index()
+            index[key] = {"path": path, "revision": revision}
+            _save_snapshot_index(index)
+        return {"success": True, "path": path, "revision": revision}
@@ -9,15 +9,21 @@ Provides agents with the ability to:
 - Manage assets and templates
 """
 
+import io
 import os
 import json
+import re
+import shlex
 import shutil
+import signal
+import sys
+import time
 import subprocess
 import logging
 import asyncio
-import aiofiles
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -25,6 +31,16 @@ logger = logging.getLogger(__name__)
 # Base directory for all game projects
 PROJECTS_BASE = Path("exports/games")
 
+# Max concurrent file operations while scaffolding a template
+_SCAFFOLD_CONCURRENCY = 64
+
+# Buffer/chunk size for large file writes and copies
+_IO_BUFFER_SIZE = 1024 * 1024
+
+# Dedicated pool for file I/O, sized for bursty scaffold/copy work and kept
+# apart from the loop's default executor used by other libraries
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=_SCAFFOLD_CONCURRENCY, thread_name_prefix='projbuild-io')
+
 # Approved package managers and their install commands
 PACKAGE_MANAGERS = {
     "npm": {"install": "npm install", "init": "npm init -y", "check": "npm --version"},
@@ -34,6 +50,9 @@ PACKAGE_MANAGERS = {
     "pnpm": {"install": "pnpm add", "init": "pnpm init", "check": "pnpm --version"},
 }
 
+# Result of check_manager_available per manager, for the life of the process
+_MANAGER_AVAILABLE: Dict[str, bool] = {}
+
 # Approved external tools that agents can request installation for
 APPROVED_TOOLS = {
     # Game Engines & Frameworks
@@ -272,6 +291,194 @@ PROJECT_TEMPLATES = {
 }
 
 
+# package.json as json.dumps(..., indent=2) would produce it; only the name varies
+_PACKAGE_JSON_TEMPLATE = (
+    '{{\n'
+    '  "name": "{name}",\n'
+    '  "version": "0.1.0",\n'
+    '  "type": "module",\n'
+    '  "scripts": {{\n'
+    '    "dev": "vite",\n'
+    '    "build": "vite build",\n'
+    '    "preview": "vite preview"\n'
+    '  }}\n'
+    '}}'
+)
+
+_README_TEMPLATE = "# {name}\n\n{description}\n\n## Getting Started\n\n```bash\nnpm install\nnpm run dev\n```\n"
+
+
+def _render_package_json(project_name: str, description: str) -> str:
+    # json.dumps of the bare string gives the escaped name inside its quotes
+    return _PACKAGE_JSON_TEMPLATE.format(name=json.dumps(project_name)[1:-1])
+
+
+def _render_readme(project_name: str, description: str) -> str:
+    return _README_TEMPLATE.format(name=project_name, description=description)
+
+
+# Generators for template entries whose content is None (filled in per project)
+_DYNAMIC_FILES: Dict[str, Callable[[str, str], str]] = {
+    "package.json": _render_package_json,
+    "README.md": _render_readme,
+}
+
+
+def _leaf_dirs(dirs: Sequence[str]) -> Tuple[str, ...]:
+    """Directories that are not a parent of another entry; makedirs on these creates the rest."""
+    dirs = [d.rstrip("/") for d in dirs]
+    parents = {d.rpartition("/")[0] for d in dirs}
+    return tuple(d for d in dirs if d not in parents)
+
+
+class _CompiledTemplate(NamedTuple):
+    """A PROJECT_TEMPLATES entry flattened into parallel arrays for scaffolding."""
+    description: str
+    dirs: Tuple[str, ...]  # shortest first
+    leaf_dirs: Tuple[str, ...]
+    files: Tuple[Tuple[str, Any], ...]  # (path, text or renderer)
+    npm_packages: Tuple[str, ...]
+
+
+def _compile_template(template: Dict[str, Any], prefix: str = "") -> _CompiledTemplate:
+    """Flatten a nested template into dir/file arrays and resolve its npm dependencies."""
+    dirs: List[str] = []
+    files: List[Tuple[str, Any]] = []
+
+    def walk(node: Dict, path: str):
+        for name, content in node.items():
+            # Directory keys end in "/"; drop it so paths join without "//"
+            current_path = f"{path}/{name.rstrip('/')}" if path else name.rstrip('/')
+            if isinstance(content, dict):
+                dirs.append(current_path)
+                walk(content, current_path)
+            elif content is None:
+                if name in _DYNAMIC_FILES:
+                    files.append((current_path, _DYNAMIC_FILES[name]))
+            else:
+                files.append((current_path, content))
+
+    walk(template["structure"], prefix)
+    dirs.sort(key=len)
+    npm_packages = tuple(
+        APPROVED_TOOLS[dep]["package"]
+        for dep in template.get("dependencies", [])
+        if dep in APPROVED_TOOLS and APPROVED_TOOLS[dep]["type"] == "npm"
+    )
+    return _CompiledTemplate(template["description"], tuple(dirs), _leaf_dirs(dirs), tuple(files), npm_packages)
+
+
+# Templates are static, so flatten them once instead of on every scaffold
+_COMPILED_TEMPLATES = {name: _compile_template(t) for name, t in PROJECT_TEMPLATES.items()}
+
+
+# ASCII characters that are not alphanumeric, '-' or '_' become '_' in project names
+_SANITIZE_TABLE = str.maketrans({
+    c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c in "-_")
+})
+
+
+async def _to_io_thread(fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, fn, *args)
+
+
+def _create_empty_file(path: Union[str, Path]):
+    # A bare creat/truncate; skips building a text wrapper and encoder for nothing
+    os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666))
+
+
+def _write_file_sync(path: Path, content: str, make_parent: bool = True):
+    if make_parent:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    if not content:
+        _create_empty_file(path)
+        return
+    # Large content gets a large buffer so it isn't flushed in 8KB writes
+    buffering = _IO_BUFFER_SIZE if len(content) > io.DEFAULT_BUFFER_SIZE else -1
+    with open(path, 'w', encoding='utf-8', buffering=buffering) as f:
+        f.write(content)
+
+
+def _copy_binary(src: str, dst: str):
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, _IO_BUFFER_SIZE)
+
+
+def _write_tree_sync(base: Path, leaf_dirs: Sequence[str], files: Sequence[Tuple[str, str]]):
+    if not leaf_dirs:
+        os.makedirs(base, exist_ok=True)
+    for d in leaf_dirs:
+        os.makedirs(base / d, exist_ok=True)
+    for p, content in files:
+        if not content:
+            _create_empty_file(base / p)
+            continue
+        with open(base / p, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def _append_file_sync(path: Path, content: str):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _read_file_sync(path: Path) -> str:
+    return path.read_text(encoding='utf-8')
+
+
+def _list_directory_sync(path: Path) -> List[Dict[str, Any]]:
+    # DirEntry caches the file type from readdir, so only files need a stat
+    with os.scandir(path) as it:
+        return [{
+            "name": entry.name,
+            "type": "directory" if entry.is_dir() else "file",
+            "size": entry.stat().st_size if entry.is_file() else None,
+        } for entry in it]
+
+
+def _sendfile_copy(src: str, dst: str):
+    """Copy one file in-kernel with sendfile, keeping metadata like copy2."""
+    if sys.platform != "linux":
+        _copy_binary(src, dst)
+        shutil.copystat(src, dst)
+        return
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        count = max(os.fstat(src_fd).st_size, _IO_BUFFER_SIZE)
+        offset = 0
+        while True:
+            sent = os.sendfile(dst_fd, src_fd, offset, count)
+            if not sent:
+                break
+            offset += sent
+    shutil.copystat(src, dst)
+
+
+def _plan_tree_copy(src: Path, dst: Path) -> List[Tuple[str, str]]:
+    """Create dst's directory tree (dst itself must not exist) and return the file pairs to copy."""
+    os.makedirs(dst)
+    pairs: List[Tuple[str, str]] = []
+    for root, dirnames, filenames in os.walk(src, followlinks=True):
+        target = os.path.join(dst, os.path.relpath(root, src))
+        for name in dirnames:
+            os.makedirs(os.path.join(target, name), exist_ok=True)
+        for name in filenames:
+            pairs.append((os.path.join(root, name), os.path.join(target, name)))
+    return pairs
+
+
+async def _copy_tree_fast(src: Path, dst: Path):
+    """copytree replacement that copies the files in parallel."""
+    pairs = await _to_io_thread(_plan_tree_copy, src, dst)
+    semaphore = asyncio.Semaphore(_SCAFFOLD_CONCURRENCY)
+
+    async def copy_one(s: str, d: str):
+        async with semaphore:
+            await _to_io_thread(_sendfile_copy, s, d)
+
+    await asyncio.gather(*[copy_one(s, d) for s, d in pairs])
+
+
 class ProjectBuilder:
     """High-level project management for game development."""
 
@@ -280,23 +487,48 @@ class ProjectBuilder:
         self.base_path = base_path or PROJECTS_BASE
         self.project_path = self.base_path / self.project_name
         self.installed_tools: List[str] = []
-        self.log_entries: List[str] = []
+        # (timestamp, message) pairs; formatted only when log_entries is read
+        self._log_records: List[Tuple[float, str]] = []
+        # Directories known to exist, so create_file can skip the mkdir
+        self._known_dirs: Set[Path] = set()
 
     def _sanitize_name(self, name: str) -> str:
         """Sanitize project name for filesystem."""
-        return "".join(c if c.isalnum() or c in "-_" else "_" for c in name.lower())
+        name = name.lower()
+        if name.isascii():
+            return name.translate(_SANITIZE_TABLE)
+        return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+    def _resolve(self, path: Union[str, Path]) -> Path:
+        """Resolve a path relative to the project; absolute paths are kept as given."""
+        # Joining an absolute path already yields that path, so no separate
+        # Path(path).is_absolute() check (and throwaway Path) is needed
+        return self.project_path / path
 
     def _log(self, message: str):
         """Log an action."""
-        entry = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
-        self.log_entries.append(entry)
-        logger.info(message)
+        self._log_records.append((time.time(), message))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(message)
+
+    @property
+    def log_entries(self) -> List[str]:
+        """Logged actions as "[HH:MM:SS] message" strings."""
+        return [
+            f"[{time.strftime('%H:%M:%S', time.localtime(ts))}] {message}"
+            for ts, message in self._log_records
+        ]
 
     async def create_directory(self, path: Union[str, Path], exist_ok: bool = True) -> Dict[str, Any]:
         """Create a directory."""
-        full_path = self.project_path / path if not Path(path).is_absolute() else Path(path)
+        full_path = self._resolve(path)
         try:
             full_path.mkdir(parents=True, exist_ok=exist_ok)
+            self._known_dirs.add(full_path)
+            for parent in full_path.parents:
+                if parent in self._known_dirs:
+                    break
+                self._known_dirs.add(parent)
             self._log(f"Created directory: {full_path}")
             return {"success": True, "path": str(full_path)}
         except Exception as e:
@@ -304,22 +536,46 @@ class ProjectBuilder:
 
     async def create_file(self, path: Union[str, Path], content: str = "") -> Dict[str, Any]:
         """Create a file with content."""
-        full_path = self.project_path / path if not Path(path).is_absolute() else Path(path)
+        full_path = self._resolve(path)
         try:
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-            async with aiofiles.open(full_path, 'w', encoding='utf-8') as f:
-                await f.write(content)
+            parent = full_path.parent
+            # One thread hop per file instead of one per open/write/close
+            await _to_io_thread(_write_file_sync, full_path, content, parent not in self._known_dirs)
+            self._known_dirs.add(parent)
             self._log(f"Created file: {full_path}")
             return {"success": True, "path": str(full_path)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def write_tree(
+        self,
+        dirs: Sequence[str],
+        files: Sequence[Tuple[str, str]],
+        leaf_dirs: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Create directories and files under the project in one bulk operation."""
+        if leaf_dirs is None:
+            leaf_dirs = _leaf_dirs(dirs)
+        try:
+            await _to_io_thread(_write_tree_sync, self.project_path, leaf_dirs, files)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        self._known_dirs.add(self.project_path)
+        self._log(f"Created directory: {self.project_path}")
+        for d in dirs:
+            full_path = self.project_path / d
+            self._known_dirs.add(full_path)
+            self._log(f"Created directory: {full_path}")
+        for p, _ in files:
+            self._log(f"Created file: {self.project_path / p}")
+        return {"success": True, "path": str(self.project_path)}
+
     async def append_file(self, path: Union[str, Path], content: str) -> Dict[str, Any]:
         """Append content to a file."""
-        full_path = self.project_path / path if not Path(path).is_absolute() else Path(path)
+        full_path = self._resolve(path)
         try:
-            async with aiofiles.open(full_path, 'a', encoding='utf-8') as f:
-                await f.write(content)
+            await _to_io_thread(_append_file_sync, full_path, content)
             self._log(f"Appended to file: {full_path}")
             return {"success": True, "path": str(full_path)}
         except Exception as e:
@@ -327,32 +583,25 @@ class ProjectBuilder:
 
     async def read_file(self, path: Union[str, Path]) -> Dict[str, Any]:
         """Read a file's content."""
-        full_path = self.project_path / path if not Path(path).is_absolute() else Path(path)
+        full_path = self._resolve(path)
         try:
-            async with aiofiles.open(full_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            content = await _to_io_thread(_read_file_sync, full_path)
             return {"success": True, "content": content, "path": str(full_path)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def list_directory(self, path: Union[str, Path] = ".") -> Dict[str, Any]:
         """List directory contents."""
-        full_path = self.project_path / path if path != "." else self.project_path
+        full_path = self._resolve(path)
         try:
-            items = []
-            for item in full_path.iterdir():
-                items.append({
-                    "name": item.name,
-                    "type": "directory" if item.is_dir() else "file",
-                    "size": item.stat().st_size if item.is_file() else None,
-                })
+            items = await _to_io_thread(_list_directory_sync, full_path)
             return {"success": True, "path": str(full_path), "items": items}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def delete_path(self, path: Union[str, Path]) -> Dict[str, Any]:
         """Delete a file or directory."""
-        full_path = self.project_path / path if not Path(path).is_absolute() else Path(path)
+        full_path = self._resolve(path)
 
         # Safety check - don't delete outside project
         if not str(full_path).startswith(str(self.project_path)):
@@ -361,6 +610,7 @@ class ProjectBuilder:
         try:
             if full_path.is_dir():
                 shutil.rmtree(full_path)
+                self._known_dirs.clear()
             else:
                 full_path.unlink()
             self._log(f"Deleted: {full_path}")
@@ -370,11 +620,11 @@ class ProjectBuilder:
 
     async def copy_path(self, src: Union[str, Path], dst: Union[str, Path]) -> Dict[str, Any]:
         """Copy a file or directory."""
-        src_path = self.project_path / src if not Path(src).is_absolute() else Path(src)
-        dst_path = self.project_path / dst if not Path(dst).is_absolute() else Path(dst)
+        src_path = self._resolve(src)
+        dst_path = self._resolve(dst)
         try:
             if src_path.is_dir():
-                shutil.copytree(src_path, dst_path)
+                await _copy_tree_fast(src_path, dst_path)
             else:
                 dst_path.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(src_path, dst_path)
@@ -385,17 +635,83 @@ class ProjectBuilder:
 
     async def move_path(self, src: Union[str, Path], dst: Union[str, Path]) -> Dict[str, Any]:
         """Move a file or directory."""
-        src_path = self.project_path / src if not Path(src).is_absolute() else Path(src)
-        dst_path = self.project_path / dst if not Path(dst).is_absolute() else Path(dst)
+        src_path = self._resolve(src)
+        dst_path = self._resolve(dst)
         try:
             dst_path.parent.mkdir(parents=True, exist_ok=True)
             shutil.move(str(src_path), str(dst_path))
+            self._known_dirs.clear()
             self._log(f"Moved: {src_path} -> {dst_path}")
             return {"success": True, "source": str(src_path), "destination": str(dst_path)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
 
+# Characters that only mean something to a shell (pipes, redirects, globs,
+# expansions), plus backslashes, which shlex and cmd.exe read differently
+_SHELL_SYNTAX_RE = re.compile(r"[|&;<>()$`*?\[\]{}~#\n\\]")
+
+
+def _exec_args(command: str) -> List[str]:
+    """Split a command line for exec, resolving the program on PATH (npm.cmd etc. on Windows)."""
+    args = shlex.split(command)
+    args[0] = shutil.which(args[0]) or args[0]
+    return args
+
+
+def _plain_exec_args(command: str) -> Optional[List[str]]:
+    """
+    Exec args for a command that needs no shell, or None if it does.
+
+    Commands using shell syntax, env assignments or builtins (cd, dir, ...)
+    still go through the shell; everything else skips the extra sh fork.
+    """
+    if _SHELL_SYNTAX_RE.search(command):
+        return None
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return None
+    if not args or "=" in args[0]:
+        return None
+    program = shutil.which(args[0])
+    if program is None:
+        return None
+    args[0] = program
+    return args
+
+
+def _kill_process_group(proc: asyncio.subprocess.Process):
+    """Kill the child and, on POSIX, everything in its process group."""
+    try:
+        if os.name != 'nt':
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _communicate(proc: asyncio.subprocess.Process, timeout: float) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Wait for a subprocess without blocking the loop.
+
+    The child must be started with start_new_session=True: on timeout or
+    cancellation the whole group is killed, so grandchildren of a shell
+    can't hold the pipes open past the deadline.
+    """
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException:
+        _kill_process_group(proc)
+        await proc.wait()
+        raise
+    return (
+        stdout.decode('utf-8', errors='replace') if stdout is not None else None,
+        stderr.decode('utf-8', errors='replace') if stderr is not None else None,
+    )
+
+
 class PackageManager:
     """Manages package installation for projects."""
 
@@ -408,17 +724,27 @@ class PackageManager:
         if manager not in PACKAGE_MANAGERS:
             return False
 
-        check_cmd = PACKAGE_MANAGERS[manager]["check"]
-        try:
-            result = subprocess.run(
-                check_cmd,
-                shell=True,
-                capture_output=True,
-                timeout=10
-            )
-            return result.returncode == 0
-        except:
-            return False
+        if manager in _MANAGER_AVAILABLE:
+            return _MANAGER_AVAILABLE[manager]
+
+        # A PATH lookup rules out missing managers without spawning anything
+        available = False
+        if shutil.which(manager):
+            check_cmd = PACKAGE_MANAGERS[manager]["check"]
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *_exec_args(check_cmd),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True
+                )
+                await _communicate(proc, 10)
+                available = proc.returncode == 0
+            except Exception:
+                available = False
+
+        _MANAGER_AVAILABLE[manager] = available
+        return available
 
     async def init_project(self, manager: str = "npm") -> Dict[str, Any]:
         """Initialize a project with a package manager."""
@@ -430,18 +756,18 @@ class PackageManager:
             return {"success": True, "message": f"{manager} does not require initialization"}
 
         try:
-            result = subprocess.run(
-                init_cmd,
+            proc = await asyncio.create_subprocess_exec(
+                *_exec_args(init_cmd),
                 cwd=str(self.project_path),
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=60
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
+            stdout, stderr = await _communicate(proc, 60)
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "success": proc.returncode == 0,
+                "stdout": stdout,
+                "stderr": stderr
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -463,29 +789,71 @@ class PackageManager:
 
         try:
             logger.info(f"Installing package: {full_cmd}")
-            result = subprocess.run(
-                full_cmd,
+            proc = await asyncio.create_subprocess_exec(
+                *_exec_args(full_cmd),
                 cwd=str(self.project_path),
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes for large packages
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
+            stdout, stderr = await _communicate(proc, 300)  # 5 minutes for large packages
 
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 self.installed_packages.append(package)
 
             return {
-                "success": result.returncode == 0,
+                "success": proc.returncode == 0,
                 "package": package,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "stdout": stdout,
+                "stderr": stderr
             }
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {"success": False, "error": f"Installation timed out for {package}"}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def install_packages(self, packages: List[str], manager: str = "npm", dev: bool = False) -> Dict[str, Any]:
+        """Install several packages with a single package manager invocation."""
+        if manager not in PACKAGE_MANAGERS:
+            return {"success": False, "error": f"Unknown package manager: {manager}"}
+        if not packages:
+            return {"success": True, "packages": [], "stdout": "", "stderr": ""}
+
+        install_cmd = PACKAGE_MANAGERS[manager]["install"]
+        if manager == "npm" and dev:
+            install_cmd += " --save-dev"
+        elif manager == "yarn" and dev:
+            install_cmd += " --dev"
+
+        # Entries like "webpack webpack-cli" name more than one package
+        names = " ".join(shlex.quote(name) for package in packages for name in package.split())
+        full_cmd = f"{install_cmd} {names}"
+
+        try:
+            logger.info(f"Installing packages: {full_cmd}")
+            proc = await asyncio.create_subprocess_exec(
+                *_exec_args(full_cmd),
+                cwd=str(self.project_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            stdout, stderr = await _communicate(proc, 300)
+
+            if proc.returncode == 0:
+                self.installed_packages.extend(packages)
+
+            return {
+                "success": proc.returncode == 0,
+                "packages": packages,
+                "stdout": stdout,
+                "stderr": stderr
+            }
+        except asyncio.TimeoutError:
+            return {"success": False, "error": f"Installation timed out for {', '.join(packages)}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
     async def install_approved_tool(self, tool_name: str) -> Dict[str, Any]:
         """Install an approved tool from the whitelist."""
         if tool_name not in APPROVED_TOOLS:
@@ -509,6 +877,13 @@ class PackageManager:
         )
 
 
+# Command fragments ToolExecutor refuses to run, matched case-insensitively in one pass
+_DANGEROUS_RE = re.compile(
+    '|'.join(re.escape(p) for p in ('rm -rf /', 'mkfs', 'dd if=/dev/', ':(){', 'chmod -R 777 /')),
+    re.IGNORECASE
+)
+
+
 class ToolExecutor:
     """Executes external tools and commands."""
 
@@ -527,37 +902,46 @@ class ToolExecutor:
         work_dir = cwd or self.project_path
 
         # Security check - basic sanitization
-        dangerous_patterns = ['rm -rf /', 'mkfs', 'dd if=/dev/', ':(){', 'chmod -R 777 /']
-        for pattern in dangerous_patterns:
-            if pattern in command.lower():
-                return {"success": False, "error": f"Blocked dangerous command pattern"}
+        if _DANGEROUS_RE.search(command):
+            return {"success": False, "error": f"Blocked dangerous command pattern"}
 
         try:
             logger.info(f"Executing: {command} in {work_dir}")
 
-            result = subprocess.run(
-                command,
-                cwd=str(work_dir),
-                shell=True,
-                capture_output=capture_output,
-                text=True,
-                timeout=timeout
-            )
+            pipe = asyncio.subprocess.PIPE if capture_output else None
+            args = _plain_exec_args(command)
+            if args is not None:
+                proc = await asyncio.create_subprocess_exec(
+                    *args,
+                    cwd=str(work_dir),
+                    stdout=pipe,
+                    stderr=pipe,
+                    start_new_session=True
+                )
+            else:
+                proc = await asyncio.create_subprocess_shell(
+                    command,
+                    cwd=str(work_dir),
+                    stdout=pipe,
+                    stderr=pipe,
+                    start_new_session=True
+                )
+            stdout, stderr = await _communicate(proc, timeout)
 
             self.command_history.append({
                 "command": command,
                 "cwd": str(work_dir),
-                "returncode": result.returncode,
+                "returncode": proc.returncode,
                 "timestamp": datetime.now().isoformat()
             })
 
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout if capture_output else None,
-                "stderr": result.stderr if capture_output else None,
-                "returncode": result.returncode
+                "success": proc.returncode == 0,
+                "stdout": stdout,
+                "stderr": stderr,
+                "returncode": proc.returncode
             }
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {"success": False, "error": f"Command timed out ({timeout}s)"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -569,10 +953,11 @@ class ToolExecutor:
     async def run_dev_server(self, command: str = "npm run dev") -> Dict[str, Any]:
         """Start the development server (runs in background)."""
         try:
+            args = _plain_exec_args(command)
             process = subprocess.Popen(
-                command,
+                args if args is not None else command,
                 cwd=str(self.project_path),
-                shell=True,
+                shell=args is None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE
             )
@@ -605,52 +990,24 @@ async def scaffold_project(
         }
 
     builder = ProjectBuilder(project_name, base_path)
-    template_data = PROJECT_TEMPLATES[template]
-
-    # Create project directory
-    await builder.create_directory(".")
-
-    # Create structure recursively
-    async def create_structure(structure: Dict, path: str = ""):
-        for name, content in structure.items():
-            current_path = f"{path}/{name}" if path else name
-
-            if isinstance(content, dict):
-                # It's a directory
-                await builder.create_directory(current_path)
-                await create_structure(content, current_path)
-            elif content is None:
-                # Generate dynamic content
-                if name == "package.json":
-                    pkg_content = json.dumps({
-                        "name": project_name,
-                        "version": "0.1.0",
-                        "type": "module",
-                        "scripts": {
-                            "dev": "vite",
-                            "build": "vite build",
-                            "preview": "vite preview"
-                        }
-                    }, indent=2)
-                    await builder.create_file(current_path, pkg_content)
-                elif name == "README.md":
-                    readme = f"# {project_name}\n\n{template_data['description']}\n\n## Getting Started\n\n```bash\nnpm install\nnpm run dev\n```\n"
-                    await builder.create_file(current_path, readme)
-            else:
-                # It's a file with content
-                await builder.create_file(current_path, content)
+    compiled = _COMPILED_TEMPLATES[template]
+    rendered = [
+        (p, c if isinstance(c, str) else c(project_name, compiled.description))
+        for p, c in compiled.files
+    ]
 
-    await create_structure(template_data["structure"])
+    # Write the whole tree in one worker thread rather than a task per file
+    result = await builder.write_tree(compiled.dirs, rendered, compiled.leaf_dirs)
+    if not result["success"]:
+        return result
 
     # Initialize package manager and install dependencies
     pkg_manager = PackageManager(builder.project_path)
 
     # Check if npm is available
     if await pkg_manager.check_manager_available("npm"):
-        # Install template dependencies
-        for dep in template_data.get("dependencies", []):
-            if dep in APPROVED_TOOLS:
-                await pkg_manager.install_approved_tool(dep)
+        # Install template dependencies in one npm run
+        await pkg_manager.install_packages(list(compiled.npm_packages))
 
     return {
         "success": True,
@@ -13,14 +13,210 @@ This module provides comprehensive tool processing for:
 import os
 import re
 import asyncio
+import shlex
+import signal
 import shutil
-import aiofiles
 import logging
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Tool tag patterns, compiled once rather than looked up in re's cache per call
+_WRITE_FILE_RE = re.compile(r'<write_file\s+path=["\'](.*?)["\']>(.*?)</write_file>', re.DOTALL)
+_READ_FILE_RE = re.compile(r'<read_file\s+path=["\'](.*?)["\']\s*/>')
+_LIST_DIR_RE = re.compile(r'<list_dir\s+path=["\'](.*?)["\']\s*/>')
+_CREATE_DIR_RE = re.compile(r'<create_dir\s+path=["\'](.*?)["\']\s*/>')
+_DELETE_FILE_RE = re.compile(r'<delete_file\s+path=["\'](.*?)["\']\s*/>')
+_DELETE_DIR_RE = re.compile(r'<delete_dir\s+path=["\'](.*?)["\']\s*/>')
+_APPEND_FILE_RE = re.compile(r'<append_file\s+path=["\'](.*?)["\']>(.*?)</append_file>', re.DOTALL)
+_COPY_RE = re.compile(r'<copy\s+path=["\'](.*?)["\']\s+to=["\'](.*?)["\']\s*/>')
+_MOVE_RE = re.compile(r'<move\s+path=["\'](.*?)["\']\s+to=["\'](.*?)["\']\s*/>')
+_SCAFFOLD_PROJECT_RE = re.compile(r'<scaffold_project\s+name=["\'](.*?)["\'](?:\s+template=["\'](.*?)["\'])?\s*/>')
+_INSTALL_PACKAGE_RE = re.compile(r'<install_package\s+name=["\'](.*?)["\'](?:\s+manager=["\'](.*?)["\'])?\s*/>')
+_INSTALL_TOOL_RE = re.compile(r'<install_tool\s+name=["\'](.*?)["\']\s*/>')
+_RUN_COMMAND_RE = re.compile(r'<run_command\s+command=["\'](.*?)["\'](?:\s+timeout=["\'](\d+)["\'])?\s*/>')
+_RUN_BUILD_RE = re.compile(r'<run_build(?:\s+command=["\'](.*?)["\'])?\s*/>')
+
+_TAG_PATTERNS = {
+    "write_file": _WRITE_FILE_RE,
+    "read_file": _READ_FILE_RE,
+    "list_dir": _LIST_DIR_RE,
+    "create_dir": _CREATE_DIR_RE,
+    "delete_file": _DELETE_FILE_RE,
+    "delete_dir": _DELETE_DIR_RE,
+    "append_file": _APPEND_FILE_RE,
+    "copy": _COPY_RE,
+    "move": _MOVE_RE,
+    "scaffold_project": _SCAFFOLD_PROJECT_RE,
+    "install_package": _INSTALL_PACKAGE_RE,
+    "install_tool": _INSTALL_TOOL_RE,
+    "run_command": _RUN_COMMAND_RE,
+    "run_build": _RUN_BUILD_RE,
+}
+
+# Every tag as one alternation, so the output is scanned once; DOTALL stays
+# scoped to the patterns that had it. The group name is the tag (lastgroup).
+_TOOL_TAG_RE = re.compile('|'.join(
+    f"(?P<{tag}>(?s:{pattern.pattern}))" if pattern.flags & re.DOTALL else f"(?P<{tag}>{pattern.pattern})"
+    for tag, pattern in _TAG_PATTERNS.items()
+))
+
+# File tags whose handlers only touch the paths in these groups, so they may run
+# concurrently with each other; any other tag is a barrier
+_FILE_TAG_PATH_GROUPS = {
+    "write_file": (1,),
+    "read_file": (1,),
+    "list_dir": (1,),
+    "create_dir": (1,),
+    "delete_file": (1,),
+    "delete_dir": (1,),
+    "append_file": (1,),
+    "copy": (1, 2),
+    "move": (1, 2),
+}
+_MAX_CONCURRENT_FILE_OPS = 32
+
+# Subprocess output is read in chunks of this size and only a tail is kept
+_READ_CHUNK = 64 * 1024
+
+
+def _paths_overlap(a: str, b: str) -> bool:
+    """True if one normalized absolute path is, or is inside, the other."""
+    if a == b:
+        return True
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return longer.startswith(shorter.rstrip(os.sep) + os.sep)
+
+# Markdown code fences wrapped around written file content
+_FENCE_OPEN_RE = re.compile(r'^```\w*\s*\n?')
+_FENCE_CLOSE_RE = re.compile(r'\n?```\s*$')
+
+# Command fragments <run_command> refuses to run, matched case-insensitively
+_DANGEROUS_RE = re.compile(
+    '|'.join(re.escape(p) for p in ('rm -rf /', 'mkfs', 'dd if=/dev/', ':(){', 'chmod -R 777 /')),
+    re.IGNORECASE
+)
+
+
+def _write_file_sync(path: str, content: str, mode: str):
+    # Directory creation, open, write and close in one worker-thread hop
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(content)
+
+
+def _read_file_sync(path: str) -> Optional[str]:
+    """Return the file's text, or None if it does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _list_dir_sync(path: str) -> Optional[List[str]]:
+    """Formatted entries of a directory, or None if it is not one."""
+    try:
+        # DirEntry.is_dir uses the type readdir already returned, no stat per entry
+        with os.scandir(path) as it:
+            return [f"- {'📁 ' if entry.is_dir() else '📄 '}{entry.name}" for entry in it]
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _delete_file_sync(path: str) -> bool:
+    """Unlink a regular file; False if there was none to delete."""
+    if not os.path.isfile(path):
+        return False
+    os.unlink(path)
+    return True
+
+
+def _delete_dir_sync(path: str) -> bool:
+    """Remove a directory tree; False if there was none to delete."""
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+def _copy_sync(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+
+def _move_sync(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    shutil.move(src, dst)
+
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    """Kill the child and, on POSIX, everything in its process group."""
+    try:
+        if os.name != 'nt':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _run_and_tail(
+    cmd: str, cwd: str, timeout: float, tail_bytes: int, shell: bool = False
+) -> Tuple[int, str]:
+    """
+    Run a command and return (returncode, last tail_bytes of stdout+stderr).
+
+    Output is streamed through a bounded buffer instead of collected whole, so
+    a chatty install doesn't hold megabytes only to show a short excerpt.
+    Commands built here are exec'd directly; shell=True is for agent-supplied
+    commands that may use pipes or redirects. The process (and, on POSIX,
+    its whole process group) is killed on timeout or cancellation.
+    """
+    # Own process group, so a kill also reaches grandchildren of the shell that
+    # would otherwise keep the pipe open
+    if shell:
+        process = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, cwd=cwd,
+            start_new_session=True
+        )
+    else:
+        args = shlex.split(cmd)
+        args[0] = shutil.which(args[0]) or args[0]
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, cwd=cwd,
+            start_new_session=True
+        )
+
+    tail: deque = deque()
+    size = 0
+
+    async def pump():
+        nonlocal size
+        while True:
+            chunk = await process.stdout.read(_READ_CHUNK)
+            if not chunk:
+                break
+            tail.append(chunk)
+            size += len(chunk)
+            while size - len(tail[0]) >= tail_bytes:
+                size -= len(tail.popleft())
+        await process.wait()
+
+    try:
+        await asyncio.wait_for(pump(), timeout)
+    except BaseException:
+        # Timeout or cancellation: don't leave the command running
+        _kill_process_group(process)
+        await process.wait()
+        raise
+    return process.returncode, b"".join(tail)[-tail_bytes:].decode("utf-8", errors="replace")
+
 
 class ToolProcessor:
     """Processes AntiGravity tool XML blocks from agent output."""
@@ -29,6 +225,9 @@ class ToolProcessor:
         self.engine = engine
         self.node = node
         self.base_dir = base_dir or os.getcwd()
+        # Normalized once; the separator keeps "/base" from admitting "/base2"
+        self._base_norm = os.path.normpath(self.base_dir)
+        self._base_prefix = self._base_norm.rstrip(os.sep) + os.sep
         self.results: Dict[str, list] = {
             "files_created": [],
             "files_deleted": [],
@@ -41,7 +240,7 @@ class ToolProcessor:
     def _safe_path(self, path: str) -> Optional[str]:
         """Validate and return safe absolute path within base_dir."""
         target = os.path.normpath(os.path.join(self.base_dir, path))
-        if not target.startswith(self.base_dir):
+        if target != self._base_norm and not target.startswith(self._base_prefix):
             return None
         return target
 
@@ -58,21 +257,45 @@ class ToolProcessor:
             await self.engine.emit_thought(self.node.name, content)
 
     async def process_all(self, output: str):
-        """Process all tool blocks in the output."""
-        await self._process_write_file(output)
-        await self._process_read_file(output)
-        await self._process_list_dir(output)
-        await self._process_create_dir(output)
-        await self._process_delete_file(output)
-        await self._process_delete_dir(output)
-        await self._process_append_file(output)
-        await self._process_copy(output)
-        await self._process_move(output)
-        await self._process_scaffold_project(output)
-        await self._process_install_package(output)
-        await self._process_install_tool(output)
-        await self._process_run_command(output)
-        await self._process_run_build(output)
+        """
+        Process all tool blocks in the output, in the order they appear.
+
+        Consecutive file operations on unrelated paths run concurrently; an
+        operation touching a path that overlaps a pending one, and every
+        command/install/scaffold tag, first waits for the pending batch.
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FILE_OPS)
+        pending: List[Awaitable[None]] = []
+        pending_paths: List[str] = []
+
+        async def bounded(coro: Awaitable[None]):
+            async with semaphore:
+                await coro
+
+        for match in _TOOL_TAG_RE.finditer(output):
+            tag = match.lastgroup
+            # Re-match just this tag to get its own attribute/body groups
+            match = _TAG_PATTERNS[tag].match(output, match.start())
+            handler = getattr(self, f"_handle_{tag}")
+
+            path_groups = _FILE_TAG_PATH_GROUPS.get(tag)
+            if path_groups is None:
+                # Commands and installs can touch anything under base_dir
+                if pending:
+                    await asyncio.gather(*pending)
+                    pending, pending_paths = [], []
+                await handler(match)
+                continue
+
+            paths = [p for p in (self._safe_path(match.group(g)) for g in path_groups) if p]
+            if any(_paths_overlap(p, q) for p in paths for q in pending_paths):
+                await asyncio.gather(*pending)
+                pending, pending_paths = [], []
+            pending.append(bounded(handler(match)))
+            pending_paths.extend(paths)
+
+        if pending:
+            await asyncio.gather(*pending)
 
         return self.results
 
@@ -80,308 +303,243 @@ class ToolProcessor:
         """Clean content by removing markdown code fences and extra whitespace."""
         content = content.strip()
         # Remove markdown code fences like ```typescript or ```json
-        content = re.sub(r'^```\w*\s*\n?', '', content)
-        content = re.sub(r'\n?```\s*$', '', content)
+        content = _FENCE_OPEN_RE.sub('', content)
+        content = _FENCE_CLOSE_RE.sub('', content)
         return content.strip()
 
-    async def _process_write_file(self, output: str):
+    async def _handle_write_file(self, match: re.Match):
         """Handle <write_file path="...">content</write_file>"""
-        matches = re.finditer(r'<write_file\s+path=["\'](.*?)["\']>(.*?)</write_file>', output, re.DOTALL)
-        for match in matches:
-            file_path = match.group(1)
-            content = self._clean_content(match.group(2))
-            target = self._safe_path(file_path)
-            if not target:
-                await self.log(f"❌ Security: blocked write to {file_path}")
-                self.results["errors"].append(f"Blocked write: {file_path}")
-                continue
-            if not content:
-                await self.log(f"⚠️ Skipped empty file: {file_path}")
-                continue
-            try:
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                async with aiofiles.open(target, "w", encoding="utf-8") as f:
-                    await f.write(content)
-                await self.log(f"💾 Created/Updated: {file_path} ({len(content)} chars)")
-                self.results["files_created"].append(file_path)
-            except Exception as e:
-                await self.log(f"❌ Write Error: {e}")
-                self.results["errors"].append(str(e))
-
-    async def _process_read_file(self, output: str):
+        file_path = match.group(1)
+        content = self._clean_content(match.group(2))
+        target = self._safe_path(file_path)
+        if not target:
+            await self.log(f"❌ Security: blocked write to {file_path}")
+            self.results["errors"].append(f"Blocked write: {file_path}")
+            return
+        if not content:
+            await self.log(f"⚠️ Skipped empty file: {file_path}")
+            return
+        try:
+            await asyncio.to_thread(_write_file_sync, target, content, "w")
+            await self.log(f"💾 Created/Updated: {file_path} ({len(content)} chars)")
+            self.results["files_created"].append(file_path)
+        except Exception as e:
+            await self.log(f"❌ Write Error: {e}")
+            self.results["errors"].append(str(e))
+
+    async def _handle_read_file(self, match: re.Match):
         """Handle <read_file path="..."/>"""
-        matches = re.finditer(r'<read_file\s+path=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            file_path = match.group(1)
-            target = self._safe_path(file_path)
-            if not target:
-                await self.log(f"❌ Security: blocked read of {file_path}")
-                continue
-            try:
-                if os.path.exists(target):
-                    async with aiofiles.open(target, "r", encoding="utf-8") as f:
-                        content = await f.read()
-                    preview = content[:2000] + ("\n*(truncated...)*" if len(content) > 2000 else "")
-                    await self.emit_thought(f"### READ FILE: `{file_path}`\n```\n{preview}\n```")
-                    await self.log(f"📖 Read: {file_path}")
-                else:
-                    await self.log(f"⚠️ File not found: {file_path}")
-            except Exception as e:
-                await self.log(f"❌ Read Error: {e}")
-
-    async def _process_list_dir(self, output: str):
+        file_path = match.group(1)
+        target = self._safe_path(file_path)
+        if not target:
+            await self.log(f"❌ Security: blocked read of {file_path}")
+            return
+        try:
+            content = await asyncio.to_thread(_read_file_sync, target)
+            if content is not None:
+                preview = content[:2000] + ("\n*(truncated...)*" if len(content) > 2000 else "")
+                await self.emit_thought(f"### READ FILE: `{file_path}`\n```\n{preview}\n```")
+                await self.log(f"📖 Read: {file_path}")
+            else:
+                await self.log(f"⚠️ File not found: {file_path}")
+        except Exception as e:
+            await self.log(f"❌ Read Error: {e}")
+
+    async def _handle_list_dir(self, match: re.Match):
         """Handle <list_dir path="..."/>"""
-        matches = re.finditer(r'<list_dir\s+path=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            dir_path = match.group(1)
-            target = self._safe_path(dir_path)
-            if not target:
-                await self.log(f"❌ Security: blocked list of {dir_path}")
-                continue
-            try:
-                if os.path.exists(target) and os.path.isdir(target):
-                    items = os.listdir(target)
-                    formatted = "\n".join([f"- {'📁 ' if os.path.isdir(os.path.join(target, f)) else '📄 '}{f}" for f in items])
-                    await self.emit_thought(f"### LIST DIR: `{dir_path}`\n{formatted}")
-                    await self.log(f"📂 Listed: {dir_path} ({len(items)} items)")
-                else:
-                    await self.log(f"⚠️ Directory not found: {dir_path}")
-            except Exception as e:
-                await self.log(f"❌ List Error: {e}")
-
-    async def _process_create_dir(self, output: str):
+        dir_path = match.group(1)
+        target = self._safe_path(dir_path)
+        if not target:
+            await self.log(f"❌ Security: blocked list of {dir_path}")
+            return
+        try:
+            items = await asyncio.to_thread(_list_dir_sync, target)
+            if items is not None:
+                formatted = "\n".join(items)
+                await self.emit_thought(f"### LIST DIR: `{dir_path}`\n{formatted}")
+                await self.log(f"📂 Listed: {dir_path} ({len(items)} items)")
+            else:
+                await self.log(f"⚠️ Directory not found: {dir_path}")
+        except Exception as e:
+            await self.log(f"❌ List Error: {e}")
+
+    async def _handle_create_dir(self, match: re.Match):
         """Handle <create_dir path="..."/>"""
-        matches = re.finditer(r'<create_dir\s+path=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            dir_path = match.group(1)
-            target = self._safe_path(dir_path)
-            if not target:
-                await self.log(f"❌ Security: blocked mkdir {dir_path}")
-                continue
-            try:
-                os.makedirs(target, exist_ok=True)
-                await self.log(f"📁 Created directory: {dir_path}")
-                self.results["dirs_created"].append(dir_path)
-            except Exception as e:
-                await self.log(f"❌ Mkdir Error: {e}")
-
-    async def _process_delete_file(self, output: str):
+        dir_path = match.group(1)
+        target = self._safe_path(dir_path)
+        if not target:
+            await self.log(f"❌ Security: blocked mkdir {dir_path}")
+            return
+        try:
+            await asyncio.to_thread(os.makedirs, target, exist_ok=True)
+            await self.log(f"📁 Created directory: {dir_path}")
+            self.results["dirs_created"].append(dir_path)
+        except Exception as e:
+            await self.log(f"❌ Mkdir Error: {e}")
+
+    async def _handle_delete_file(self, match: re.Match):
         """Handle <delete_file path="..."/>"""
-        matches = re.finditer(r'<delete_file\s+path=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            file_path = match.group(1)
-            target = self._safe_path(file_path)
-            if not target:
-                await self.log(f"❌ Security: blocked delete {file_path}")
-                continue
-            try:
-                if os.path.exists(target) and os.path.isfile(target):
-                    os.unlink(target)
-                    await self.log(f"🗑️ Deleted file: {file_path}")
-                    self.results["files_deleted"].append(file_path)
-            except Exception as e:
-                await self.log(f"❌ Delete Error: {e}")
-
-    async def _process_delete_dir(self, output: str):
+        file_path = match.group(1)
+        target = self._safe_path(file_path)
+        if not target:
+            await self.log(f"❌ Security: blocked delete {file_path}")
+            return
+        try:
+            if await asyncio.to_thread(_delete_file_sync, target):
+                await self.log(f"🗑️ Deleted file: {file_path}")
+                self.results["files_deleted"].append(file_path)
+        except Exception as e:
+            await self.log(f"❌ Delete Error: {e}")
+
+    async def _handle_delete_dir(self, match: re.Match):
         """Handle <delete_dir path="..."/>"""
-        matches = re.finditer(r'<delete_dir\s+path=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            dir_path = match.group(1)
-            target = self._safe_path(dir_path)
-            if not target:
-                await self.log(f"❌ Security: blocked rmdir {dir_path}")
-                continue
-            try:
-                if os.path.exists(target) and os.path.isdir(target):
-                    shutil.rmtree(target)
-                    await self.log(f"🗑️ Deleted directory: {dir_path}")
-            except Exception as e:
-                await self.log(f"❌ Rmdir Error: {e}")
-
-    async def _process_append_file(self, output: str):
+        dir_path = match.group(1)
+        target = self._safe_path(dir_path)
+        if not target:
+            await self.log(f"❌ Security: blocked rmdir {dir_path}")
+            return
+        try:
+            if await asyncio.to_thread(_delete_dir_sync, target):
+                await self.log(f"🗑️ Deleted directory: {dir_path}")
+        except Exception as e:
+            await self.log(f"❌ Rmdir Error: {e}")
+
+    async def _handle_append_file(self, match: re.Match):
         """Handle <append_file path="...">content</append_file>"""
-        matches = re.finditer(r'<append_file\s+path=["\'](.*?)["\']>(.*?)</append_file>', output, re.DOTALL)
-        for match in matches:
-            file_path = match.group(1)
-            content = match.group(2).strip()
-            target = self._safe_path(file_path)
-            if not target:
-                await self.log(f"❌ Security: blocked append to {file_path}")
-                continue
-            try:
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                async with aiofiles.open(target, "a", encoding="utf-8") as f:
-                    await f.write(content + "\n")
-                await self.log(f"📝 Appended to: {file_path}")
-            except Exception as e:
-                await self.log(f"❌ Append Error: {e}")
-
-    async def _process_copy(self, output: str):
+        file_path = match.group(1)
+        content = match.group(2).strip()
+        target = self._safe_path(file_path)
+        if not target:
+            await self.log(f"❌ Security: blocked append to {file_path}")
+            return
+        try:
+            await asyncio.to_thread(_write_file_sync, target, content + "\n", "a")
+            await self.log(f"📝 Appended to: {file_path}")
+        except Exception as e:
+            await self.log(f"❌ Append Error: {e}")
+
+    async def _handle_copy(self, match: re.Match):
         """Handle <copy path="..." to="..."/>"""
-        matches = re.finditer(r'<copy\s+path=["\'](.*?)["\']\s+to=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            src, dst = match.group(1), match.group(2)
-            src_path = self._safe_path(src)
-            dst_path = self._safe_path(dst)
-            if not src_path or not dst_path:
-                await self.log(f"❌ Security: blocked copy")
-                continue
-            try:
-                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                if os.path.isdir(src_path):
-                    shutil.copytree(src_path, dst_path)
-                else:
-                    shutil.copy2(src_path, dst_path)
-                await self.log(f"📋 Copied: {src} → {dst}")
-            except Exception as e:
-                await self.log(f"❌ Copy Error: {e}")
-
-    async def _process_move(self, output: str):
+        src, dst = match.group(1), match.group(2)
+        src_path = self._safe_path(src)
+        dst_path = self._safe_path(dst)
+        if not src_path or not dst_path:
+            await self.log(f"❌ Security: blocked copy")
+            return
+        try:
+            await asyncio.to_thread(_copy_sync, src_path, dst_path)
+            await self.log(f"📋 Copied: {src} → {dst}")
+        except Exception as e:
+            await self.log(f"❌ Copy Error: {e}")
+
+    async def _handle_move(self, match: re.Match):
         """Handle <move path="..." to="..."/>"""
-        matches = re.finditer(r'<move\s+path=["\'](.*?)["\']\s+to=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            src, dst = match.group(1), match.group(2)
-            src_path = self._safe_path(src)
-            dst_path = self._safe_path(dst)
-            if not src_path or not dst_path:
-                await self.log(f"❌ Security: blocked move")
-                continue
-            try:
-                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                shutil.move(src_path, dst_path)
-                await self.log(f"📦 Moved: {src} → {dst}")
-            except Exception as e:
-                await self.log(f"❌ Move Error: {e}")
-
-    async def _process_scaffold_project(self, output: str):
+        src, dst = match.group(1), match.group(2)
+        src_path = self._safe_path(src)
+        dst_path = self._safe_path(dst)
+        if not src_path or not dst_path:
+            await self.log(f"❌ Security: blocked move")
+            return
+        try:
+            await asyncio.to_thread(_move_sync, src_path, dst_path)
+            await self.log(f"📦 Moved: {src} → {dst}")
+        except Exception as e:
+            await self.log(f"❌ Move Error: {e}")
+
+    async def _handle_scaffold_project(self, match: re.Match):
         """Handle <scaffold_project name="..." template="..."/>"""
-        matches = re.finditer(r'<scaffold_project\s+name=["\'](.*?)["\'](?:\s+template=["\'](.*?)["\'])?\s*/>', output)
-        for match in matches:
-            name = match.group(1)
-            template = match.group(2) or "web-game"
-            try:
-                from core.tools.project_builder import scaffold_project
-                await self.log(f"🏗️ Scaffolding: {name} (template: {template})")
-                result = await scaffold_project(name, template)
-                if result["success"]:
-                    await self.log(f"✅ Project created: {result['project_path']}")
-                    await self.emit_thought(f"### PROJECT SCAFFOLDED\nPath: {result['project_path']}\nTemplate: {template}")
-                else:
-                    await self.log(f"❌ Scaffold Error: {result.get('error')}")
-            except Exception as e:
-                await self.log(f"❌ Scaffold Error: {e}")
-
-    async def _process_install_package(self, output: str):
+        name = match.group(1)
+        template = match.group(2) or "web-game"
+        try:
+            from core.tools.project_builder import scaffold_project
+            await self.log(f"🏗️ Scaffolding: {name} (template: {template})")
+            result = await scaffold_project(name, template)
+            if result["success"]:
+                await self.log(f"✅ Project created: {result['project_path']}")
+                await self.emit_thought(f"### PROJECT SCAFFOLDED\nPath: {result['project_path']}\nTemplate: {template}")
+            else:
+                await self.log(f"❌ Scaffold Error: {result.get('error')}")
+        except Exception as e:
+            await self.log(f"❌ Scaffold Error: {e}")
+
+    async def _handle_install_package(self, match: re.Match):
         """Handle <install_package name="..." manager="..."/>"""
-        matches = re.finditer(r'<install_package\s+name=["\'](.*?)["\'](?:\s+manager=["\'](.*?)["\'])?\s*/>', output)
-        for match in matches:
-            package = match.group(1)
-            manager = match.group(2) or "npm"
-            try:
-                await self.log(f"📦 Installing: {package} via {manager}")
-                cmd_map = {
-                    "npm": f"npm install {package}",
-                    "yarn": f"yarn add {package}",
-                    "pip": f"pip install {package}",
-                    "pnpm": f"pnpm add {package}",
-                }
-                cmd = cmd_map.get(manager, f"npm install {package}")
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=self.base_dir
-                )
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)
-                if process.returncode == 0:
-                    await self.log(f"✅ Installed: {package}")
-                    self.results["packages_installed"].append(package)
-                else:
-                    await self.log(f"⚠️ Install warning: {stderr.decode()[:200]}")
-            except asyncio.TimeoutError:
-                await self.log(f"⏱️ Install timed out: {package}")
-            except Exception as e:
-                await self.log(f"❌ Install Error: {e}")
-
-    async def _process_install_tool(self, output: str):
+        package = match.group(1)
+        manager = match.group(2) or "npm"
+        try:
+            await self.log(f"📦 Installing: {package} via {manager}")
+            cmd_map = {
+                "npm": f"npm install {package}",
+                "yarn": f"yarn add {package}",
+                "pip": f"pip install {package}",
+                "pnpm": f"pnpm add {package}",
+            }
+            cmd = cmd_map.get(manager, f"npm install {package}")
+            returncode, tail = await _run_and_tail(cmd, self.base_dir, 300, 200)
+            if returncode == 0:
+                await self.log(f"✅ Installed: {package}")
+                self.results["packages_installed"].append(package)
+            else:
+                await self.log(f"⚠️ Install warning: {tail}")
+        except asyncio.TimeoutError:
+            await self.log(f"⏱️ Install timed out: {package}")
+        except Exception as e:
+            await self.log(f"❌ Install Error: {e}")
+
+    async def _handle_install_tool(self, match: re.Match):
         """Handle <install_tool name="..."/>"""
-        matches = re.finditer(r'<install_tool\s+name=["\'](.*?)["\']\s*/>', output)
-        for match in matches:
-            tool_name = match.group(1)
-            try:
-                from core.tools.project_builder import APPROVED_TOOLS
-                if tool_name not in APPROVED_TOOLS:
-                    await self.log(f"❌ Tool not approved: {tool_name}")
-                    continue
-                info = APPROVED_TOOLS[tool_name]
-                if info["type"] == "system":
-                    await self.log(f"⚠️ {tool_name} requires manual install")
-                    continue
-                await self.log(f"🔧 Installing tool: {tool_name} ({info['description']})")
-                cmd = f"npm install {info['package']}" if info["type"] == "npm" else f"pip install {info['package']}"
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=self.base_dir
-                )
-                await asyncio.wait_for(process.communicate(), timeout=300)
-                if process.returncode == 0:
-                    await self.log(f"✅ Tool installed: {tool_name}")
-                    self.results["packages_installed"].append(tool_name)
-            except Exception as e:
-                await self.log(f"❌ Tool Install Error: {e}")
-
-    async def _process_run_command(self, output: str):
+        tool_name = match.group(1)
+        try:
+            from core.tools.project_builder import APPROVED_TOOLS
+            if tool_name not in APPROVED_TOOLS:
+                await self.log(f"❌ Tool not approved: {tool_name}")
+                return
+            info = APPROVED_TOOLS[tool_name]
+            if info["type"] == "system":
+                await self.log(f"⚠️ {tool_name} requires manual install")
+                return
+            await self.log(f"🔧 Installing tool: {tool_name} ({info['description']})")
+            cmd = f"npm install {info['package']}" if info["type"] == "npm" else f"pip install {info['package']}"
+            returncode, _ = await _run_and_tail(cmd, self.base_dir, 300, 200)
+            if returncode == 0:
+                await self.log(f"✅ Tool installed: {tool_name}")
+                self.results["packages_installed"].append(tool_name)
+        except Exception as e:
+            await self.log(f"❌ Tool Install Error: {e}")
+
+    async def _handle_run_command(self, match: re.Match):
         """Handle <run_command command="..." timeout="..."/>"""
-        matches = re.finditer(r'<run_command\s+command=["\'](.*?)["\'](?:\s+timeout=["\'](\d+)["\'])?\s*/>', output)
-        for match in matches:
-            cmd = match.group(1)
-            timeout = int(match.group(2)) if match.group(2) else 120
-
-            # Security check
-            dangerous = ['rm -rf /', 'mkfs', 'dd if=/dev/', ':(){', 'chmod -R 777 /']
-            if any(d in cmd.lower() for d in dangerous):
-                await self.log(f"❌ Blocked dangerous command: {cmd[:50]}")
-                continue
-
-            try:
-                await self.log(f"⚙️ Executing: {cmd}")
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=self.base_dir
-                )
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-                result = stdout.decode().strip() or stderr.decode().strip() or "Success (No Output)"
-                await self.emit_thought(f"### COMMAND: `{cmd}`\n```\n{result[:2000]}\n```")
-                self.results["commands_run"].append(cmd)
-            except asyncio.TimeoutError:
-                await self.log(f"⏱️ Command timed out: {cmd}")
-            except Exception as e:
-                await self.log(f"❌ Command Error: {e}")
-
-    async def _process_run_build(self, output: str):
+        cmd = match.group(1)
+        timeout = int(match.group(2)) if match.group(2) else 120
+
+        # Security check
+        if _DANGEROUS_RE.search(cmd):
+            await self.log(f"❌ Blocked dangerous command: {cmd[:50]}")
+            return
+
+        try:
+            await self.log(f"⚙️ Executing: {cmd}")
+            _, tail = await _run_and_tail(cmd, self.base_dir, timeout, 2000, shell=True)
+            result = tail.strip() or "Success (No Output)"
+            await self.emit_thought(f"### COMMAND: `{cmd}`\n```\n{result}\n```")
+            self.results["commands_run"].append(cmd)
+        except asyncio.TimeoutError:
+            await self.log(f"⏱️ Command timed out: {cmd}")
+        except Exception as e:
+            await self.log(f"❌ Command Error: {e}")
+
+    async def _handle_run_build(self, match: re.Match):
         """Handle <run_build command="..."/>"""
-        matches = re.finditer(r'<run_build(?:\s+command=["\'](.*?)["\'])?\s*/>', output)
-        for match in matches:
-            cmd = match.group(1) or "npm run build"
-            try:
-                await self.log(f"🔨 Running build: {cmd}")
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=self.base_dir
-                )
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)
-                if process.returncode == 0:
-                    await self.log(f"✅ Build complete")
-                else:
-                    await self.log(f"❌ Build failed: {stderr.decode()[:500]}")
-            except Exception as e:
-                await self.log(f"❌ Build Error: {e}")
+        cmd = match.group(1) or "npm run build"
+        try:
+            await self.log(f"🔨 Running build: {cmd}")
+            returncode, tail = await _run_and_tail(cmd, self.base_dir, 300, 500, shell=True)
+            if returncode == 0:
+                await self.log(f"✅ Build complete")
+            else:
+                await self.log(f"❌ Build failed: {tail}")
+        except Exception as e:
+            await self.log(f"❌ Build Error: {e}")
 
 
 async def process_tools(output: str, node: Any, engine: Any, base_dir: Optional[str] = None) -> Dict[str, list]:
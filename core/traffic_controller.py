@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from enum import IntEnum
 from dataclasses import dataclass, field
 from typing import Optional
@@ -36,6 +37,9 @@ class TrafficController:
         self.is_paused = False
         self._paused_event = asyncio.Event()
         self._paused_event.set() # Initially not paused (set=True means go)
+        # Single long-lived task that hands slots to queued items, started on first use
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
 
     async def acquire_slot(self, node_name: str, priority: Priority = Priority.STANDARD):
         """
@@ -44,7 +48,9 @@ class TrafficController:
         # 1. Check Pause State
         await self._paused_event.wait()
 
-        # If we can acquire immediately and queue is empty, do it (Fast Path)
+        # If we can acquire immediately and queue is empty, do it (Fast Path).
+        # acquire() on an unlocked semaphore returns without yielding, so
+        # nothing can slip in between the check and taking the slot.
         if self.queue.empty() and not self.semaphore.locked():
             await self.semaphore.acquire()
             self.active_count += 1
@@ -52,76 +58,50 @@ class TrafficController:
             return
 
         # 2. Enqueue
-        import time
         future = asyncio.get_event_loop().create_future()
         item = QueueItem(priority=priority, timestamp=time.time(), future=future, name=node_name)
-        await self.queue.put(item)
+        self.queue.put_nowait(item)
         logger.info(f"🚦 [Traffic] Queued: {node_name} (Priority: {priority.name}, Pos: {self.queue.qsize()})")
 
-        # 3. Wait for our turn
-        # We process the queue in background or just have a loop?
-        # Actually, standard Semaphore doesn't respect Priority Queue.
-        # We need a custom dispatcher loop OR we just wait on the future.
-        # Let's verify: access to the semaphore must be mediated by the queue.
-        
-        # Self-driving logic:
-        # We wait for the FUTURE to be set. The future is set by `_process_queue`.
-        # Ensure _process_queue is running.
-        asyncio.create_task(self._process_next())
-        
-        await future
+        # 3. Wait for the dispatcher to hand us a slot
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just as we were cancelled: give the slot back
+            if future.done() and not future.cancelled():
+                self.semaphore.release()
+            raise
         self.active_count += 1
         logger.info(f"🚦 [Traffic] Acquired: {node_name} (Active: {self.active_count}/{self.max_concurrency})")
 
     async def release_slot(self):
-        """Release the slot and trigger the next item."""
+        """Release the slot; a dispatcher waiting on the semaphore picks up the next item."""
         self.active_count -= 1
         self.semaphore.release()
         logger.info(f"🚦 [Traffic] Released. (Active: {self.active_count}/{self.max_concurrency})")
-        
-        # Trigger next check
-        asyncio.create_task(self._process_next())
-
-    async def _process_next(self):
-        """Try to move specific items from Queue to Semaphore."""
-        if self.queue.empty():
-            return
 
-        # Acquire semaphore (this checks specific availability)
-        # BUT `release_slot` releases the semaphore usage.
-        # This function acts as the bridge.
-        
-        # We actually don't want the TASK to hold the semaphore directly in `acquire_slot` fast path
-        # if we want Strict Priority. But for simplicity, Fast Path is fine if queue empty.
-        
-        # Strict logic:
-        # Wait for semaphore availability
-        if self.semaphore.locked():
-             return # Can't schedule yet
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._run_dispatcher())
 
-        # If available, pop highest priority
-        try:
-            # Check pause again
-            await self._paused_event.wait()
-            
-            # Non-blocking check before we commit to popping?
-            # Creating a critical section to ensure we don't pop if we can't run
-            # Actually, standard pattern:
-            # 1. Acquire sem
-            await self.semaphore.acquire()
-            
-            # 2. Get item
-            item = await self.queue.get()
-            
-            # 3. Signal item
-            if not item.future.done():
-                item.future.set_result(True)
-            else:
-                 # Cancelled? Release
-                 self.semaphore.release()
-                 
-        except asyncio.QueueEmpty:
-            self.semaphore.release()
+    async def _run_dispatcher(self):
+        """Move items from the priority queue to the semaphore, highest priority first."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while not self.queue.empty():
+                await self._paused_event.wait()
+                await self.semaphore.acquire()
+                # Pop only once a slot is held, so a higher-priority item that
+                # arrived while we waited goes first
+                item = self.queue.get_nowait()
+                if item.future.done():
+                    # Waiter was cancelled; keep the slot for the next item
+                    self.semaphore.release()
+                else:
+                    item.future.set_result(True)
 
     def set_pause(self, paused: bool):
         self.is_paused = paused
@@ -131,8 +111,7 @@ class TrafficController:
         else:
             self._paused_event.set()
             logger.info("🚦 [Traffic] SYSTEM RESUMED.")
-            # Kickstart queue
-            asyncio.create_task(self._process_next())
+            # The dispatcher is parked on _paused_event and resumes by itself
 
     def update_concurrency(self, limit: int):
         logger.info(f"🚦 [Traffic] Concurrency limit changed: {self.max_concurrency} -> {limit}")
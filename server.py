@@ -23,6 +23,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, field_validator
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load .env file
 load_dotenv()
 
@@ -52,6 +57,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _dumps_message(message: dict) -> str:
+    """Serialize a websocket message (orjson when available, stdlib json otherwise)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                message,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode()
+        except TypeError:
+            pass
+    return json.dumps(message, default=str)
+
+
 class ConnectionManager:
     """Manages WebSocket connections for broadcasting updates."""
     
@@ -72,7 +91,7 @@ class ConnectionManager:
         if not self.active_connections:
             return
         
-        data = json.dumps(message, default=str)
+        data = _dumps_message(message)
         disconnected = set()
         
         for connection in self.active_connections:
@@ -267,6 +286,11 @@ async def lifespan(app: FastAPI):
         await health_task
     except asyncio.CancelledError:
         pass
+
+    from core.nodes.trigger_nodes import close_session
+    from core.nodes.system_nodes import close_browsers
+    await close_session()
+    await close_browsers()
     logger.info("Shutting down server...")
 
 